@@ -2,38 +2,78 @@
 AuditAgent
 ----------
 Responsibility:
-- Observes all traffic
+- Observes all traffic (registered as an Orchestrator observer, not a queued agent)
 - Logs agent interactions for debugging and transparency
-- Saves a trace.json audit trail
+- Appends an audit_trail.jsonl trail through a batched background writer
 """
-import json
 import os
 from datetime import datetime
+from pydantic import BaseModel
 from core.agent import Agent
+from core.audit_writer import AuditWriter
 from core.schema import AuditLog
 
 class AuditAgent(Agent):
-    def __init__(self, name):
+    # Structured field selection per payload type (Pydantic `include` spec).
+    # Types not listed are logged by field names only.
+    SUMMARY_FIELDS = {
+        "ProductData": {"name": True, "price": True},
+        "QuestionOutput": {"product": {"name"}, "product_b": {"name"}, "critique": True, "iteration": True},
+    }
+    MAX_VALUE_CHARS = 80
+
+    def __init__(self, name, log_path: str = None, payload_mode: str = "summary",
+                 batch_size: int = 256, flush_interval: float = 1.0):
         super().__init__(name)
-        self.logs = []
+        # payload_mode: "type" (no payload), "summary" (selected fields) or "full"
+        self.payload_mode = payload_mode
+        log_path = log_path or os.path.join(os.getcwd(), "logs", "audit_trail.jsonl")
+        self.writer = AuditWriter(log_path, batch_size=batch_size, flush_interval=flush_interval)
 
-    async def think(self, message):
-        print(f"DEBUG: AuditAgent logging message from {message.sender} to {message.metadata.get('original_receiver', message.receiver)}")
+    def summarize(self, payload):
+        if self.payload_mode == "type":
+            return None
+        if isinstance(payload, BaseModel):
+            if self.payload_mode == "full":
+                return payload.model_dump(mode="json")
+            include = self.SUMMARY_FIELDS.get(type(payload).__name__)
+            if include is None:
+                return {"fields": list(type(payload).model_fields)}
+            return payload.model_dump(include=include, mode="json")
+        if isinstance(payload, dict):
+            if self.payload_mode == "full":
+                return payload
+            summary = {}
+            for key, value in payload.items():
+                if isinstance(value, str):
+                    summary[key] = value[:self.MAX_VALUE_CHARS]
+                elif isinstance(value, (int, float, bool)) or value is None:
+                    summary[key] = value
+                else:
+                    summary[key] = f"<{type(value).__name__}>"
+            return summary
+        return f"<{type(payload).__name__}>"
+
+    def observe(self, message):
+        """Orchestrator observer hook: called once per routed message."""
         log_entry = {
             "timestamp": datetime.now().isoformat(),
             "sender": message.sender,
             "receiver": message.metadata.get("original_receiver", message.receiver),
             "payload_type": type(message.payload).__name__,
-            "payload": str(message.payload)[:500] # Truncated for log clarity
+            "payload": self.summarize(message.payload)
         }
-        self.logs.append(log_entry)
-        return log_entry
+        if "correlation_id" in message.metadata:
+            log_entry["correlation_id"] = message.metadata["correlation_id"]
+        # Buffered; flushed in batches off the event loop
+        self.writer.write(AuditLog(**log_entry).model_dump(mode="json", exclude_unset=True))
 
-    async def act(self, log_entry):
-        # Periodically save logs
-        log_path = os.path.join(os.getcwd(), "logs")
-        os.makedirs(log_path, exist_ok=True)
-        file_path = os.path.join(log_path, "audit_trail.json")
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(self.logs, f, indent=4)
+    async def think(self, message):
+        # Still usable as a regular queued agent
+        self.observe(message)
+
+    async def act(self, result):
         return None
+
+    async def close(self):
+        await self.writer.close()
@@ -5,38 +5,77 @@ Responsibility:
 - Critiques the output of QuestionAgent
 - Checks for depth, categorization, and quality
 - Forces a retry loop if standards aren't met
+- Emits a structured critique (failing sections + shortfall) so only
+  the deficient parts are regenerated
 """
 from core.agent import Agent
 from core.message import Message
-from core.schema import QuestionOutput
+from core.schema import CritiqueItem, QuestionOutput
 
 class EditorAgent(Agent):
+    CATEGORIES = ["Informational", "Usage", "Safety", "Purchase", "Comparison"]
+    MIN_TOTAL = 15
+    MIN_PER_CATEGORY = 1 # No FAQ page section may be empty
+    MIN_PER_SECTION = {"Safety": 2}
+    MAX_ITERATIONS = 3
+
+    @classmethod
+    def minimum(cls, category: str) -> int:
+        return max(cls.MIN_PER_CATEGORY, cls.MIN_PER_SECTION.get(category, 0))
+
+    @classmethod
+    def section_shortfalls(cls, counts: dict) -> dict:
+        """
+        Missing Q&As per category: per-category and per-section minimums
+        first, then the total spread over the smallest sections. Empty means the FAQ thresholds are met
+        (QuestionAgent also uses this to stop streamed generations early).
+        """
+        counts = {cat: counts.get(cat, 0) for cat in cls.CATEGORIES}
+        need = {cat: max(0, cls.minimum(cat) - counts[cat]) for cat in cls.CATEGORIES}
+        missing_total = cls.MIN_TOTAL - sum(counts.values()) - sum(need.values())
+        while missing_total > 0:
+            smallest = min(cls.CATEGORIES, key=lambda cat: counts[cat] + need[cat])
+            need[smallest] += 1
+            missing_total -= 1
+        return {cat: n for cat, n in need.items() if n > 0}
+
     async def think(self, message):
         data: QuestionOutput = message.payload
         
-        # Logic: We want at least 3 questions in 'Safety' and 'Comparison'
+        # Logic: We want at least 2 questions in 'Safety', none of the sections empty
         # and a minimum of 15 questions total.
-        total_questions = (
-            len(data.questions.Informational) +
-            len(data.questions.Usage) +
-            len(data.questions.Safety) +
-            len(data.questions.Purchase) +
-            len(data.questions.Comparison)
-        )
+        counts = {cat: len(getattr(data.questions, cat)) for cat in self.CATEGORIES}
+        total_questions = sum(counts.values())
 
         critique = []
-        if total_questions < 15:
-            critique.append(f"Insufficient quantity: Only {total_questions} questions generated. Need at least 15.")
+        items = []
+        if total_questions < self.MIN_TOTAL:
+            critique.append(f"Insufficient quantity: Only {total_questions} questions generated. Need at least {self.MIN_TOTAL}.")
         
-        if len(data.questions.Safety) < 2:
+        if counts["Safety"] < self.MIN_PER_SECTION["Safety"]:
             critique.append("Safety section is too sparse. Add more depth regarding side effects or contraindications.")
 
+        empty = [cat for cat in self.CATEGORIES if counts[cat] < self.MIN_PER_CATEGORY]
+        if empty:
+            critique.append(f"Empty sections: {', '.join(empty)}. Every category needs at least {self.MIN_PER_CATEGORY} question(s).")
+
+        for cat, shortfall in self.section_shortfalls(counts).items():
+            items.append(CritiqueItem(
+                section=cat, shortfall=shortfall,
+                message=f"{cat} needs {shortfall} more question(s)."
+            ))
+
         if "B" in data.product_b.name.upper() and len(data.product_b.benefits) < 20:
-             critique.append("Competitor Product B description is too generic. Make it more distinct.")
+            critique.append("Competitor Product B description is too generic. Make it more distinct.")
+            items.append(CritiqueItem(section="product_b", message=critique[-1]))
 
-        if critique and data.iteration < 3: # Limit retries to 3
-            data.critique = " | ".join(critique)
-            data.iteration += 1
+        if critique and data.iteration < self.MAX_ITERATIONS: # Limit retries to 3
+            if self.metrics:
+                self.metrics.inc("editor_rejections_total", iteration=data.iteration)
+            # Shallow copy: product, Product B and FAQ items are shared with the previous draft
+            data = data.model_copy(update={
+                "critique": " | ".join(critique), "critique_items": items, "iteration": data.iteration + 1
+            })
             return {"status": "REJECTED", "data": data}
         
         return {"status": "APPROVED", "data": data}
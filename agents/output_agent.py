@@ -1,31 +1,37 @@
 """
 OutputAgent (Async)
+Hands each product's rendered pages to a pluggable output sink
+(see core/output_sinks.py). The default FileSink writes output/<product-slug>/
+atomically and off the event loop, skipping pages whose content is unchanged.
 """
-import json
-import os
-import shutil
 from core.agent import Agent
+from core.output_sinks import FileSink
 
 class OutputAgent(Agent):
+    def __init__(self, name: str, concurrency: int = 1, inbox_size: int = 100, sink=None):
+        super().__init__(name, concurrency=concurrency, inbox_size=inbox_size)
+        self.sink = sink or FileSink("output")
+
     async def think(self, message):
-        return message.payload
+        return {"product": message.metadata.get("product", "product"), "pages": message.payload,
+                "batch": "correlation_id" in message.metadata, "key": message.metadata.get("product_key")}
 
     async def act(self, result):
-        if not isinstance(result, dict):
-            print(f"ERROR: Expected dict in OutputAgent, got {type(result)}")
+        pages = result["pages"]
+        if not isinstance(pages, dict):
+            print(f"ERROR: Expected dict in OutputAgent, got {type(pages)}")
             return None
 
-        # Fresh output dir
-        if os.path.exists("output"):
-            shutil.rmtree("output")
-        os.makedirs("output", exist_ok=True)
+        if pages.get("valid") is False:
+            # Validation failure: keep the error report next to the product's pages
+            pages = {"error": {key: value for key, value in pages.items() if key != "valid"}}
 
-        for page_name, content in result.items():
-            if page_name == "valid": continue # Skip validation results
-            file_path = os.path.join("output", f"{page_name}.json")
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(content, f, indent=4, ensure_ascii=False)
-            print(f"Saved: {file_path}")
+        pages = {page_name: content for page_name, content in pages.items() if page_name != "valid"}
+        await self.sink.write(result["product"], pages, key=result["key"])
 
-        print("\n===== SYSTEM TASK COMPLETE =====")
+        if not result["batch"]: # batch runs print one summary at the end
+            print("\n===== SYSTEM TASK COMPLETE =====")
         return None
+
+    async def close(self):
+        await self.sink.close()
@@ -24,5 +24,6 @@ class ParserAgent(Agent):
         return Message(
             sender=self.name,
             receiver="QuestionAgent",
-            payload=parsed_product
+            payload=parsed_product,
+            metadata={"product": parsed_product.name} # Carried downstream for output naming
         )
@@ -1,65 +1,134 @@
 """
 QuestionAgent (Async + Pydantic + Retry Support)
 """
-import os
 import json
 import asyncio
-import warnings
+import threading
 from typing import Optional
 
-# Suppress warnings from deprecated google-generativeai package
-warnings.filterwarnings("ignore", category=FutureWarning)
-
-import google.generativeai as genai
-from dotenv import load_dotenv
-
 from core.agent import Agent
+from core.circuit_breaker import CircuitBreaker
+from core.faq_index import FAQIndex, normalize
+from core.llm_cache import ResponseCache
+from core.llm_executor import LLMExecutor, estimate_tokens
+from core.llm_providers import LLMProvider, provider_from_settings
 from core.message import Message
-from core.schema import ProductData, QuestionOutput, FAQData, ProductBData
+from core.micro_batcher import MicroBatcher
+from core.mock_content import mock_faq_and_competitor
+from core.schema import ProductData, QuestionOutput, FAQData, FAQItem, ProductBData
+from core.settings import Settings, get_settings
+from core.stream_parser import IncrementalFAQParser
+from agents.editor_agent import EditorAgent
 
 class QuestionAgent(Agent):
+    def __init__(self, name: str, concurrency: int = 1, inbox_size: int = 100,
+                 cache: ResponseCache = None, settings: Settings = None, executor: LLMExecutor = None,
+                 provider: LLMProvider = None, faq_index: FAQIndex = None):
+        super().__init__(name, concurrency=concurrency, inbox_size=inbox_size)
+        self.settings = settings or get_settings()
+        # Decided once at startup rather than per message; no provider means mock mode
+        self.provider = provider or provider_from_settings(self.settings)
+        self.use_mock = self.provider is None
+        # Unchanged products (same model, prompt and data) skip generation entirely
+        self.cache = cache or ResponseCache(bypass=self.settings.llm_cache_bypass)
+        # Bounded, rate-limited pool for the blocking SDK calls
+        self.executor = executor or LLMExecutor.from_settings(self.settings)
+        # Skips models that keep failing until their reset timeout expires
+        self.breaker = CircuitBreaker(self.settings.llm_breaker_threshold, self.settings.llm_breaker_reset)
+        self.stream_stats = {"early_stops": 0, "truncated": 0, "invalid_items": 0}
+        self._stream_stats_lock = threading.Lock() # updated from the executor's threads
+        # First-pass generations of several products can share one prompt
+        self.batcher = None
+        self.batch_stats = {"batches": 0, "failed_batches": 0, "batched_products": 0, "fallbacks": 0}
+        if self.settings.llm_batch_size > 1 and not self.use_mock:
+            self.batcher = MicroBatcher(self._generate_batch, max_size=self.settings.llm_batch_size,
+                                        max_wait=self.settings.llm_batch_wait_ms / 1000)
+            # Workers park on the batcher, so a batch can only fill if enough of them are free
+            self.concurrency = max(self.concurrency, 2 * self.settings.llm_batch_size)
+        # Generic categories answered from earlier products instead of the LLM
+        self.faq_index = faq_index
+        if self.faq_index is None and self.settings.faq_reuse_categories and not self.use_mock:
+            self.faq_index = FAQIndex(min_products=self.settings.faq_reuse_min_products)
+
+    def bind_metrics(self, metrics):
+        super().bind_metrics(metrics)
+        metrics.gauge("llm_executor_events", lambda: [({"event": k}, v) for k, v in self.executor.stats.items()])
+        metrics.gauge("llm_cache_events", lambda: [({"event": k}, v) for k, v in self.cache.stats.items()])
+        metrics.gauge("llm_stream_events", lambda: [({"event": k}, v) for k, v in self.stream_stats.items()])
+        metrics.gauge("llm_batch_events", lambda: [({"event": k}, v) for k, v in self.batch_stats.items()])
+        if self.faq_index is not None:
+            metrics.gauge("faq_index_events", lambda: [({"event": k}, v) for k, v in self.faq_index.stats.items()])
+
     async def think(self, message):
-        load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
-        
         # Handle different payload types (Initial vs Retry)
         if isinstance(message.payload, ProductData):
             product = message.payload
-            critique = None
+            previous = None
             iteration = 1
         else:
             # Re-generation request from EditorAgent
-            product = message.payload.product
-            critique = message.payload.critique
-            iteration = message.payload.iteration
+            previous = message.payload
+            product = previous.product
+            iteration = previous.iteration
 
-        if not api_key or api_key == "enter_api_key_over_here":
-            mock_data = self._generate_mock_faq_and_competitor(product)
-            return QuestionOutput(
+        # Generated JSON is validated once here; the validated product is shared, not re-validated
+        reused = {}
+        if previous is not None and previous.critique_items:
+            # Only regenerate the sections the EditorAgent flagged (section -> missing Q&As)
+            sections = {item.section: item.shortfall for item in previous.critique_items}
+            build = lambda data: self._merge(previous, data)
+        else:
+            sections = None
+            if previous is None and self.faq_index is not None:
+                reused = await asyncio.to_thread(
+                    self.faq_index.lookup, product, self.settings.faq_reuse_categories,
+                    EditorAgent.MIN_TOTAL // len(EditorAgent.CATEGORIES)
+                )
+            if reused:
+                # Reused Q&As count toward the EditorAgent thresholds; only the rest is generated
+                counts = {cat: len(items) for cat, items in reused.items()}
+                sections = {**EditorAgent.section_shortfalls(counts), "product_b": 1}
+            build = lambda data: QuestionOutput(
                 product=product,
-                product_b=ProductBData(**mock_data["product_b"]),
-                questions=FAQData(**mock_data["faq"]),
+                product_b=ProductBData.model_validate(data["product_b"]),
+                questions=FAQData.model_validate(self._with_reused(data, reused)),
                 iteration=iteration
             )
 
-        # List of models to try
-        models_to_try = [
-            'models/gemini-flash-latest',
-            'models/gemini-1.5-flash',
-            'models/gemini-2.0-flash-exp'
-        ]
-
-        last_error = None
-        for model_name in models_to_try:
+        if not self.use_mock:
+            if previous is not None and previous.critique_items:
+                prompt = self._build_partial_prompt(previous)
+            elif reused:
+                prompt = self._build_reuse_prompt(product, reused, sections)
+            else:
+                prompt = self._build_prompt(product, previous.critique if previous else None)
             try:
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel(model_name)
-                
-                critique_context = f"\nPREVIOUS CRITIQUE: {critique}\nPlease address these issues specifically." if critique else ""
-                
-                prompt = f"""
+                if self.batcher is not None and previous is None and not reused:
+                    result = await self.batcher.submit((prompt, product, build))
+                else:
+                    result = await self._generate(prompt, product, build, sections)
+            except Exception as last_error:
+                print(f"All {self.provider.name} models failed. Last error: {last_error}. Falling back to Mock.")
+            else:
+                if previous is None and self.faq_index is not None:
+                    await asyncio.to_thread(self.faq_index.learn, product, result.questions,
+                                            self.settings.faq_reuse_categories, reused)
+                return result
+
+        mock_data = self._generate_mock_faq_and_competitor(product)
+        if sections is not None:
+            mock_data = {
+                "faq": {cat: items for cat, items in mock_data["faq"].items() if cat in sections},
+                **({"product_b": mock_data["product_b"]} if "product_b" in sections else {})
+            }
+        return build(mock_data)
+
+    def _build_prompt(self, product: ProductData, critique: Optional[str]) -> str:
+        critique_context = f"\nPREVIOUS CRITIQUE: {critique}\nPlease address these issues specifically." if critique else ""
+
+        return f"""
                 Identify as a product specialist. Generate a detailed FAQ and a fictional competitor (Product B) for:
-                {product.json()}
+                {product.model_dump_json()}
                 {critique_context}
 
                 REQUIREMENTS:
@@ -69,90 +138,347 @@ class QuestionAgent(Agent):
                 
                 OUTPUT FORMAT: Return ONLY a raw JSON object. No markdown.
                 {{
+                    "product_b": {{
+                        "name": "...",
+                        "ingredients": "...",
+                        "benefits": "...",
+                        "price": "..."
+                    }},
                     "faq": {{
                         "Informational": [{{"q": "...", "a": "..."}}, ...],
                         "Usage": [...],
                         "Safety": [...],
                         "Purchase": [...],
                         "Comparison": [...]
-                    }},
-                    "product_b": {{
-                        "name": "...",
-                        "ingredients": "...",
-                        "benefits": "...",
-                        "price": "..."
                     }}
                 }}
                 """
 
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(None, lambda: model.generate_content(prompt))
-                
-                text = response.text.strip()
-                # Extraction logic for JSON
-                if "```" in text:
-                    if "```json" in text:
-                        text = text.split("```json")[1].split("```")[0].strip()
-                    else:
-                        text = text.split("```")[1].split("```")[0].strip()
-                
-                data = json.loads(text)
-                return QuestionOutput(
-                    product=product,
-                    product_b=ProductBData(**data["product_b"]),
-                    questions=FAQData(**data["faq"]),
-                    iteration=iteration
-                )
-            except Exception as e:
-                last_error = e
+    def _build_batch_prompt(self, products: list) -> str:
+        listing = "\n                ".join(f"[P{i}] {product.model_dump_json()}" for i, product in enumerate(products))
+
+        return f"""
+                Identify as a product specialist. For EACH product below, generate a detailed FAQ and a fictional competitor (Product B).
+                {listing}
+
+                REQUIREMENTS (per product):
+                1. FAQ CATEGORIES: Informational, Usage, Safety, Purchase, Comparison.
+                2. VOLUME: At least 15 unique, high-quality Q&As.
+                3. PRODUCT B: Must be the EXACT same category but strategically different.
+
+                OUTPUT FORMAT: Return ONLY a raw JSON array with one object per product, keyed by its id. No markdown.
+                [
+                    {{
+                        "id": "P0",
+                        "product_b": {{"name": "...", "ingredients": "...", "benefits": "...", "price": "..."}},
+                        "faq": {{
+                            "Informational": [{{"q": "...", "a": "..."}}, ...],
+                            "Usage": [...],
+                            "Safety": [...],
+                            "Purchase": [...],
+                            "Comparison": [...]
+                        }}
+                    }},
+                    ...
+                ]
+                """
+
+    def _build_reuse_prompt(self, product: ProductData, reused: dict, sections: dict) -> str:
+        answered = "\n                ".join(
+            f"- {category}: " + "; ".join(item["q"] for item in items) for category, items in reused.items()
+        )
+        wanted = "\n                ".join(
+            "- product_b: a fictional competitor in the EXACT same category but strategically different."
+            if section == "product_b" else f"- faq.{section}: {shortfall} NEW product-specific Q&As"
+            for section, shortfall in sections.items()
+        )
+
+        return f"""
+                Identify as a product specialist. Generate a fictional competitor (Product B) and the product-specific FAQ for:
+                {product.model_dump_json()}
+
+                These generic questions are already answered for this product (do not repeat them):
+                {answered}
+
+                Generate ONLY these parts:
+                {wanted}
+
+                OUTPUT FORMAT: Return ONLY a raw JSON object with just the requested keys. No markdown.
+                {{
+                    "product_b": {{"name": "...", "ingredients": "...", "benefits": "...", "price": "..."}},
+                    "faq": {{"<Category>": [{{"q": "...", "a": "..."}}, ...]}}
+                }}
+                """
+
+    def _build_partial_prompt(self, previous: QuestionOutput) -> str:
+        wanted = []
+        for item in previous.critique_items:
+            if item.section == "product_b":
+                wanted.append(f"- product_b: a more distinct fictional competitor. {item.message}")
+            else:
+                asked = "; ".join(faq.q for faq in getattr(previous.questions, item.section, []))
+                wanted.append(f"- faq.{item.section}: {item.shortfall} NEW Q&As (do not repeat: {asked or 'none'})")
+        wanted = "\n                ".join(wanted)
+
+        return f"""
+                Identify as a product specialist. An existing FAQ for the product below was rejected by an editor.
+                {previous.product.model_dump_json()}
+                Current competitor (Product B): {previous.product_b.model_dump_json()}
+
+                Generate ONLY these missing parts:
+                {wanted}
+
+                OUTPUT FORMAT: Return ONLY a raw JSON object with just the requested keys. No markdown.
+                {{
+                    "product_b": {{"name": "...", "ingredients": "...", "benefits": "...", "price": "..."}},
+                    "faq": {{"<Category>": [{{"q": "...", "a": "..."}}, ...]}}
+                }}
+                """
+
+    @staticmethod
+    def _merge(previous: QuestionOutput, data: dict) -> QuestionOutput:
+        """Appends regenerated Q&As (skipping duplicates) and swaps Product B if it was regenerated."""
+        # Existing FAQItems are shared by reference (only an isinstance check), only new ones are validated
+        questions = {cat: list(getattr(previous.questions, cat)) for cat in FAQData.model_fields}
+        for section, items in data.get("faq", {}).items():
+            if section not in questions:
                 continue
+            seen = {item.q.strip().lower() for item in questions[section]}
+            for item in items:
+                item = FAQItem.model_validate(item)
+                key = item.q.strip().lower()
+                if key not in seen:
+                    seen.add(key)
+                    questions[section].append(item)
 
-        print(f"All Gemini models failed. Last error: {last_error}. Falling back to Mock.")
-        mock_data = self._generate_mock_faq_and_competitor(product)
         return QuestionOutput(
-            product=product,
-            product_b=ProductBData(**mock_data["product_b"]),
-            questions=FAQData(**mock_data["faq"]),
-            iteration=iteration
+            product=previous.product,
+            product_b=ProductBData.model_validate(data["product_b"]) if "product_b" in data else previous.product_b,
+            questions=FAQData(**questions),
+            iteration=previous.iteration
+        )
+
+    @staticmethod
+    def _with_reused(data: dict, reused: dict) -> dict:
+        """Generated FAQ with the reused Q&As in front of their categories (generated repeats dropped)."""
+        if not reused:
+            return data["faq"]
+        combined = {}
+        for category in EditorAgent.CATEGORIES:
+            items = list(reused.get(category, []))
+            seen = {normalize(item["q"]) for item in items}
+            for item in data.get("faq", {}).get(category, []):
+                # FAQItem when streamed, a dict from a complete response
+                q = item.q if isinstance(item, FAQItem) else item.get("q", "") if isinstance(item, dict) else None
+                if q is None or normalize(str(q)) not in seen:
+                    items.append(item)
+            combined[category] = items
+        return combined
+
+    @staticmethod
+    def _parse_response(text: str) -> dict:
+        text = text.strip()
+        # Extraction logic for JSON
+        if "```" in text:
+            if "```json" in text:
+                text = text.split("```json")[1].split("```")[0].strip()
+            else:
+                text = text.split("```")[1].split("```")[0].strip()
+        return json.loads(text)
+
+    def _satisfied(self, parser: IncrementalFAQParser, sections: Optional[dict]) -> bool:
+        """Whether a streamed generation already holds everything the EditorAgent will ask for."""
+        counts = parser.counts()
+        if sections is None:
+            return parser.product_b is not None and not EditorAgent.section_shortfalls(counts)
+        return all(
+            parser.product_b is not None if section == "product_b" else counts.get(section, 0) >= shortfall
+            for section, shortfall in sections.items()
         )
 
+    def _stream(self, model_name: str, prompt: str, sections: Optional[dict], cancelled: threading.Event):
+        """
+        Blocking (runs on the executor's threads). Parses the streamed response
+        incrementally and stops reading once the EditorAgent thresholds are met.
+        Returns (data, complete); a truncated or partly invalid stream still
+        yields the items that validated.
+        """
+        parser = IncrementalFAQParser()
+        stream = self.provider.stream(model_name, prompt)
+        complete = False
+        early_stop = False
+        try:
+            for chunk in stream:
+                parser.feed(chunk)
+                if self._satisfied(parser, sections):
+                    early_stop = not parser.closed
+                    complete = True
+                    break
+                if parser.closed or parser.broken or cancelled.is_set():
+                    break
+        finally:
+            stream.close()
+            complete = complete or parser.closed
+            with self._stream_stats_lock:
+                self.stream_stats["early_stops"] += early_stop
+                self.stream_stats["invalid_items"] += parser.invalid_items
+                self.stream_stats["truncated"] += parser.started and not complete
+
+        if not parser.started:
+            raise ValueError("streamed response contained no JSON object")
+        data = parser.result()
+        if sections is None:
+            if "product_b" not in data:
+                raise ValueError("streamed response ended without product_b")
+            for category in EditorAgent.CATEGORIES:
+                data["faq"].setdefault(category, [])
+        return data, complete
+
+    async def _attempt(self, model_name: str, prompt: str, product: ProductData, build,
+                       sections: Optional[dict] = None) -> QuestionOutput:
+        """One model call: cache lookup, generation, parsing and validation."""
+        cancelled = threading.Event()
+        try:
+            cache_key = self.cache.key(f"{self.provider.name}/{model_name}", prompt, product.model_dump_json())
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            complete = True
+            if cached is not None:
+                data = json.loads(cached)
+            elif self.settings.llm_stream:
+                data, complete = await self.executor.call(
+                    self._stream, model_name, prompt, sections, cancelled,
+                    estimated_tokens=estimate_tokens(prompt)
+                )
+            else:
+                response = await self.executor.call(
+                    self.provider.generate, model_name, prompt, estimated_tokens=estimate_tokens(prompt)
+                )
+                data = self._parse_response(response.text)
+
+            result = build(data)
+        except Exception:
+            self.breaker.record_failure(model_name)
+            raise
+        finally:
+            # A hedged loser stops reading its stream
+            cancelled.set()
+        self.breaker.record_success(model_name)
+        if cached is None and complete:
+            # Only cache generations that parsed and validated (not truncated streams)
+            # Streamed data holds the parser's validated models
+            text = json.dumps(data, ensure_ascii=False, default=lambda model: model.model_dump())
+            await asyncio.to_thread(self.cache.put, cache_key, text)
+        return result
+
+    async def _generate_batch(self, items: list) -> list:
+        """
+        MicroBatcher handler for first-pass generations: cached products are
+        answered directly, the rest share one prompt on the first available
+        model and the keyed array is split back per product. Every product
+        whose entry is missing or fails validation (or the whole batch, if the
+        call fails) falls back to its own single-product `_generate`.
+        """
+        results = [None] * len(items)
+        model_name = next((m for m in self.settings.gemini_models if self.breaker.allow(m)), None)
+        todo = []
+        for i, (prompt, product, build) in enumerate(items):
+            cached = None
+            if model_name is not None:
+                cached = await asyncio.to_thread(
+                    self.cache.get, self.cache.key(f"{self.provider.name}/{model_name}", prompt, product.model_dump_json())
+                )
+            if cached is not None:
+                results[i] = build(json.loads(cached))
+            else:
+                todo.append(i)
+
+        entries = {}
+        if model_name is not None and len(todo) > 1:
+            batch_prompt = self._build_batch_prompt([items[i][1] for i in todo])
+            try:
+                response = await self.executor.call(
+                    self.provider.generate, model_name, batch_prompt,
+                    estimated_tokens=estimate_tokens(batch_prompt, expected_output=1500 * len(todo))
+                )
+                parsed = self._parse_response(response.text)
+                if isinstance(parsed, dict): # {"P0": {...}} instead of an array
+                    parsed = [{"id": key, **value} for key, value in parsed.items()]
+                entries = {entry.get("id"): entry for entry in parsed if isinstance(entry, dict)}
+                self.breaker.record_success(model_name)
+            except Exception:
+                # Every product of the batch falls back to a single call below
+                self.breaker.record_failure(model_name)
+                self.batch_stats["failed_batches"] += 1
+            self.batch_stats["batches"] += 1
+
+        fallbacks = []
+        for position, i in enumerate(todo):
+            prompt, product, build = items[i]
+            data = entries.get(f"P{position}")
+            try:
+                if data is None:
+                    raise KeyError(f"P{position}")
+                data = {"product_b": data["product_b"], "faq": data["faq"]}
+                results[i] = build(data)
+            except Exception:
+                fallbacks.append(i)
+                continue
+            self.batch_stats["batched_products"] += 1
+            # Stored under the single-product key, so reruns hit the cache either way
+            await asyncio.to_thread(
+                self.cache.put, self.cache.key(f"{self.provider.name}/{model_name}", prompt, product.model_dump_json()),
+                json.dumps(data, ensure_ascii=False)
+            )
+
+        if fallbacks:
+            if len(todo) > 1:
+                self.batch_stats["fallbacks"] += len(fallbacks)
+            outcomes = await asyncio.gather(
+                *(self._generate(*items[i]) for i in fallbacks), return_exceptions=True
+            )
+            for i, outcome in zip(fallbacks, outcomes):
+                results[i] = outcome
+        return results
+
+    async def _generate(self, prompt: str, product: ProductData, build, sections: Optional[dict] = None) -> QuestionOutput:
+        """
+        Model fallback. With `llm_hedge_delay` unset models are tried one after
+        another; otherwise the next model is also started whenever the running
+        ones exceed the delay, the first valid QuestionOutput wins and the
+        losers are cancelled. Models with an open circuit are skipped.
+        """
+        candidates = iter(self.settings.gemini_models)
+        pending = set()
+        last_error = RuntimeError("every model circuit is open")
+
+        def launch():
+            # allow() hands out a half-open trial, so only ask for the model actually started
+            model_name = next((m for m in candidates if self.breaker.allow(m)), None)
+            if model_name is not None:
+                pending.add(asyncio.create_task(self._attempt(model_name, prompt, product, build, sections)))
+
+        launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.settings.llm_hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    launch() # Hedge: the running model is slow
+                    continue
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    launch() # Replace the failed attempt
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+
     def _generate_mock_faq_and_competitor(self, product):
-        name = product.name
-        return {
-            "product_b": {
-                "name": f"EliteGlow Serum B",
-                "ingredients": "Glycerin, Vitamin E, Synthetic Actives",
-                "benefits": "Deep hydration and basic barrier protection",
-                "price": "₹899"
-            },
-            "faq": {
-                "Informational": [
-                    {"q": f"How does {name} support skin barrier health?", "a": "It uses balanced actives to protect the lipid layer."},
-                    {"q": f"Is {name} suitable for sensitive skin?", "a": "Yes, it is dermatologically tested for all skin types."},
-                    {"q": f"What is the source of the {product.ingredients} in {name}?", "a": "Our ingredients are ethically sourced and medical-grade."}
-                ],
-                "Usage": [
-                    {"q": f"Can I use {name} with Retinol?", "a": "Yes, but we recommend alternating nights to avoid sensitivity."},
-                    {"q": f"How many drops of {name} should I apply?", "a": "2-3 drops are sufficient for the entire face."},
-                    {"q": f"Can I apply makeup over {name}?", "a": "Yes, wait 60 seconds for full absorption first."}
-                ],
-                "Safety": [
-                    {"q": f"Is {name} safe for pregnancy?", "a": "Consult your doctor; ingredients are generally safe but medical advice is best."},
-                    {"q": f"Will {name} cause purging?", "a": "Minor purging can occur as cell turnover increases, usually lasting 1 week."},
-                    {"q": f"Is {name} non-comedogenic?", "a": "Yes, it is formulated to not clog pores."}
-                ],
-                "Purchase": [
-                    {"q": "Is the packaging recyclable?", "a": "Yes, we use 100% recyclable glass and minimal plastic."},
-                    {"q": f"Where is {name} manufactured?", "a": "It is produced in our ISO-certified cleanroom facility."},
-                    {"q": "Do you offer a subscription discount?", "a": "Yes, subscribers save 15% on every order."}
-                ],
-                "Comparison": [
-                    {"q": f"How is {name} better than Competitor B?", "a": "It features a higher concentration of stabilized actives."},
-                    {"q": f"Does {name} replace my moisturizer?", "a": "It is a treatment serum; we recommend following with moisturizer."},
-                    {"q": f"Is {name} more effective than drug-store alternatives?", "a": "Yes, due to its medical-grade purity and delivery system."}
-                ]
-            }
-        }
+        return mock_faq_and_competitor(product.name, product.ingredients)
 
     async def act(self, payload: QuestionOutput):
         return Message(
@@ -160,3 +486,12 @@ class QuestionAgent(Agent):
             receiver="EditorAgent",
             payload=payload
         )
+
+    async def close(self):
+        stats = self.cache.stats
+        if stats["hits"] or stats["misses"]:
+            print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+        self.cache.close()
+        if self.faq_index is not None:
+            self.faq_index.close()
+        self.executor.shutdown()
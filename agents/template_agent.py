@@ -1,64 +1,42 @@
 """
 TemplateAgent (Async + Pydantic)
+Binds QuestionOutput fields to the placeholders declared by the compiled
+templates in /templates. Every template becomes a "<name>_page" output, so
+new page types only need a new template file.
 """
-import json
-import os
 from core.agent import Agent
 from core.message import Message
 from core.schema import QuestionOutput
+from core.template_engine import TemplateEngine
 
 class TemplateAgent(Agent):
-    async def think(self, message):
-        data: QuestionOutput = message.payload
-        product = data.product.dict()
-        questions = data.questions.dict()
-        prod_b = data.product_b.dict()
-
-        def load_tpl(name):
-            path = os.path.join("templates", name)
-            if not os.path.exists(path):
-                return {}
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-
-        # FAQ Page
-        faq_tpl = load_tpl("faq.json")
-        faq_tpl["title"] = faq_tpl.get("title", "").replace("{product_name}", product["name"])
-        faq_tpl["questions"] = questions
+    def __init__(self, name: str, concurrency: int = 1, inbox_size: int = 100, engine: TemplateEngine = None):
+        super().__init__(name, concurrency=concurrency, inbox_size=inbox_size)
+        self.engine = engine or TemplateEngine("templates")
 
-        # Product Page
-        prod_tpl = load_tpl("product.json")
-        prod_tpl.update({
-            "name": product["name"],
-            "concentration": product["concentration"],
-            "skin_type": product["skin_type"],
-            "key_ingredients": product["ingredients"],
-            "benefits": product["benefits"],
-            "how_to_use": product["usage"],
-            "side_effects": product["side_effects"],
-            "price": product["price"]
-        })
+    @staticmethod
+    def bind(data: QuestionOutput) -> dict:
+        """Flat placeholder context built from ProductData / ProductBData / FAQData."""
+        # One compiled dump; the page JSON needs plain dicts/lists anyway
+        dumped = data.model_dump(include={"product", "product_b", "questions"})
+        product, prod_b, questions = dumped["product"], dumped["product_b"], dumped["questions"]
 
-        # Comparison Page
-        comp_tpl = load_tpl("comparison.json")
-        comp_tpl["product_a"] = {
-            "name": product["name"],
-            "ingredients": product["ingredients"],
-            "benefits": product["benefits"],
-            "price": product["price"]
-        }
-        comp_tpl["product_b"] = prod_b
-        comp_tpl["comparison_summary"] = {
+        context = dict(product)
+        context["product_name"] = product["name"]
+        context.update({f"product_a_{key}": value for key, value in product.items()})
+        context.update({f"product_b_{key}": value for key, value in prod_b.items()})
+        context.update({f"{category.lower()}_questions": items for category, items in questions.items()})
+        context.update({
             "ingredients_comparison": f"{product['name']} vs {prod_b['name']}",
             "benefits_comparison": f"High potency vs {prod_b['benefits']}",
             "price_comparison": f"{product['price']} vs {prod_b['price']}"
-        }
+        })
+        return context
 
-        return {
-            "faq_page": faq_tpl,
-            "product_page": prod_tpl,
-            "comparison_page": comp_tpl
-        }
+    async def think(self, message):
+        data: QuestionOutput = message.payload
+        pages = self.engine.render_all(self.bind(data))
+        return {f"{name}_page": page for name, page in pages.items()}
 
     async def act(self, content):
         return Message(
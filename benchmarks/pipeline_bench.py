@@ -0,0 +1,211 @@
+"""
+Pipeline benchmark.
+Runs main.py's agent graph over N synthetic products, either with the mock
+generator or against the in-process FakeProvider (configurable latency,
+error rate and FAQ volume), and reports throughput, end-to-end latency
+percentiles, per-agent time, LLM retries and peak memory as JSON so results can be compared between commits.
+
+Usage (from the repo root):
+    python -m benchmarks.pipeline_bench --products 1000 --modes mock fake --fake-latency 0.2
+    python -m benchmarks.pipeline_bench --compare benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+from core.batch import run_catalog
+from core.llm_executor import LLMExecutor
+from core.llm_providers import FakeProvider
+from core.settings import get_settings
+from main import build_orchestrator
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def synthetic_products(n: int, invalid_rate: float = 0.0):
+    """Every 1/invalid_rate-th product has an empty "Price" (rejected by validation)."""
+    every = round(1 / invalid_rate) if invalid_rate > 0 else 0
+    for i in range(n):
+        product = {
+            "Product Name": f"Bench Serum {i:05d}",
+            "Concentration": f"{5 + i % 15}% Vitamin C",
+            "Skin Type": ["Oily", "Dry", "Combination", "Sensitive"][i % 4],
+            "Key Ingredients": "Vitamin C, Hyaluronic Acid",
+            "Benefits": "Brightening, Fades dark spots",
+            "How to Use": "Apply 2–3 drops in the morning before sunscreen",
+            "Side Effects": "Mild tingling for sensitive skin",
+            "Price": f"₹{499 + i % 500}"
+        }
+        if every and i % every == every - 1:
+            product["Price"] = ""
+        yield product
+
+def instrument(orchestrator, agent_times):
+    """Wraps every agent's think/act to accumulate wall time per agent."""
+    for agent in orchestrator.agents.values():
+        for phase in ("think", "act"):
+            original = getattr(agent, phase)
+            stats = agent_times[agent.name]
+
+            async def timed(arg, original=original, stats=stats, phase=phase):
+                started = time.perf_counter()
+                try:
+                    return await original(arg)
+                finally:
+                    stats[f"{phase}_s"] += time.perf_counter() - started
+                    stats[f"{phase}_calls"] += 1
+            setattr(agent, phase, timed)
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+async def run_mode(mode: str, args) -> dict:
+    if mode == "fake":
+        orchestrator = build_orchestrator(
+            cache_bypass=True, sink=args.sink, question_concurrency=args.llm_concurrency,
+            llm_provider=FakeProvider(latency=args.fake_latency, per_token_latency=args.fake_token_latency,
+                                      error_rate=args.fake_error_rate, faq_per_category=args.fake_faq_per_category),
+            llm_executor=LLMExecutor(max_workers=args.llm_concurrency, requests_per_minute=0, backoff_base=0.01),
+            settings=get_settings().model_copy(update={
+                "llm_stream": args.stream, "llm_batch_size": args.batch_size, "llm_batch_wait_ms": args.batch_wait_ms,
+                "faq_reuse_categories": args.faq_reuse
+            })
+        )
+    else:
+        orchestrator = build_orchestrator(cache_bypass=True, sink=args.sink)
+        orchestrator.agents["QuestionAgent"].use_mock = True
+
+    agent_times = defaultdict(lambda: defaultdict(float))
+    instrument(orchestrator, agent_times)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        summaries = await run_catalog(orchestrator, synthetic_products(args.products, args.invalid_rate),
+                                      max_in_flight=args.in_flight, prevalidate=args.prevalidate)
+    wall = time.perf_counter() - started
+    traced_peak = None
+    if args.trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    latencies = [s["elapsed_ms"] for s in summaries if "missing" not in s] # pre-rejected rows never enter the graph
+    return {
+        "mode": mode,
+        "products": len(summaries),
+        "ok": sum(s["status"] == "ok" for s in summaries),
+        "invalid": sum(s["status"] == "invalid" for s in summaries),
+        "wall_s": round(wall, 4),
+        "products_per_sec": round(len(summaries) / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3),
+        },
+        "agents": {
+            name: {k: int(v) if k.endswith("_calls") else round(v, 4) for k, v in stats.items()}
+            for name, stats in agent_times.items()
+        },
+        "llm": {**orchestrator.agents["QuestionAgent"].executor.stats,
+                **orchestrator.agents["QuestionAgent"].stream_stats,
+                **orchestrator.agents["QuestionAgent"].batch_stats,
+                **{k: v for k, v in orchestrator.agents["QuestionAgent"].provider.stats.items() if k.endswith("_tokens")},
+                **({f"faq_{k}": v for k, v in orchestrator.agents["QuestionAgent"].faq_index.stats.items()}
+                   if args.faq_reuse else {})} if mode == "fake" else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_traced_mb": round(traced_peak, 2) if traced_peak is not None else None,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["mode"]: r for r in json.load(f)["results"]}
+    for result in current["results"]:
+        base = baseline.get(result["mode"])
+        if not base:
+            continue
+        tput = (result["products_per_sec"] / base["products_per_sec"] - 1) * 100
+        p95 = (result["latency_ms"]["p95"] / base["latency_ms"]["p95"] - 1) * 100
+        print(f"{result['mode']}: throughput {tput:+.1f}%, p95 latency {p95:+.1f}% vs {baseline_path}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipeline")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--in-flight", type=int, default=32)
+    parser.add_argument("--modes", nargs="+", choices=["mock", "fake"], default=["mock", "fake"])
+    parser.add_argument("--fake-latency", type=float, default=0.05, help="seconds per fake LLM call")
+    parser.add_argument("--fake-token-latency", type=float, default=0.0, help="extra seconds per fake output token")
+    parser.add_argument("--stream", action="store_true", help="stream fake responses and stop at the EditorAgent thresholds")
+    parser.add_argument("--batch-size", type=int, default=1, help="products per batched fake prompt (1 = off)")
+    parser.add_argument("--batch-wait-ms", type=float, default=50)
+    parser.add_argument("--fake-error-rate", type=float, default=0.0, help="fraction of fake LLM calls failing with a retryable 503")
+    parser.add_argument("--fake-faq-per-category", type=int, default=3, help="below 3 forces EditorAgent regeneration loops")
+    parser.add_argument("--faq-reuse", nargs="*", default=[], metavar="CATEGORY",
+                        help="fill these FAQ categories from a catalog-wide reuse index (e.g. Purchase)")
+    parser.add_argument("--llm-concurrency", type=int, default=16, help="QuestionAgent workers / LLM threads in fake mode")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="fraction of synthetic products missing a field")
+    parser.add_argument("--prevalidate", type=int, default=0, help="bulk-validate chunks of this many rows before routing (0 = off)")
+    parser.add_argument("--sink", default="files", choices=["files", "ndjson"])
+    parser.add_argument("--trace-memory", action="store_true", help="also report tracemalloc peak (slower)")
+    parser.add_argument("--output", default=os.path.join(REPO_ROOT, "benchmarks", "results", "latest.json"))
+    parser.add_argument("--compare", metavar="BASELINE", help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "results": [],
+    }
+
+    # Run inside a scratch directory so outputs/logs never touch the repo
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="pipeline_bench_")
+    shutil.copytree(os.path.join(REPO_ROOT, "templates"), os.path.join(workdir, "templates"))
+    os.chdir(workdir)
+    try:
+        for mode in args.modes:
+            result = await run_mode(mode, args)
+            report["results"].append(result)
+            print(f"{mode}: {result['products_per_sec']} products/s, "
+                  f"p50 {result['latency_ms']['p50']} ms, p95 {result['latency_ms']['p95']} ms, "
+                  f"p99 {result['latency_ms']['p99']} ms, peak RSS {result['peak_rss_mb']} MB")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"Results: {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    asyncio.run(main())
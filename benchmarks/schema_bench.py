@@ -0,0 +1,141 @@
+"""
+Per-product cost of the Pydantic data path.
+Replays the hops one product takes through the agents (parse, first
+generation, EditorAgent rejection, partial regeneration merge, template
+binding) in two ways:
+- validated: the agents' previous path, on unfrozen copies of the models:
+  generated JSON and merges re-validate from dicts, EditorAgent rejects by
+  mutating the draft in place, serialization uses the v1 `.json()` API and
+  TemplateAgent dumps each model separately
+- shared:    the current agents' path; validation once at the raw-input /
+  generated-JSON boundary, frozen models shared by reference (model_copy,
+  nested instances) and compiled model_dump / model_dump_json
+
+Reports per product: time (best of --repeat runs), tracemalloc peak while
+running the hops and the bytes still held by the drafts (first generation
+and rejected copy, which are one object in the validated path, plus the
+merged output) and the template context.
+
+Usage (from the repo root):
+    python -m benchmarks.schema_bench --products 2000
+"""
+import argparse
+import time
+import tracemalloc
+import warnings
+
+from pydantic import ConfigDict
+
+from agents.question_agent import QuestionAgent
+from agents.template_agent import TemplateAgent
+from benchmarks.pipeline_bench import synthetic_products
+from core.mock_content import mock_faq_and_competitor
+from core.schema import CritiqueItem, FAQData, FAQItem, ProductBData, ProductData, QuestionOutput
+
+FIELDS = {
+    "name": "Product Name", "concentration": "Concentration", "skin_type": "Skin Type",
+    "ingredients": "Key Ingredients", "benefits": "Benefits", "usage": "How to Use",
+    "side_effects": "Side Effects", "price": "Price",
+}
+# What a partial regeneration returns (LLM JSON)
+REGENERATED = {"faq": {"Safety": [{"q": "Can I use it during summer?", "a": "Yes, with sunscreen."}]}}
+
+class MutableQuestionOutput(QuestionOutput):
+    """QuestionOutput as it was before the models were frozen."""
+    model_config = ConfigDict(frozen=False)
+
+def validated(raw: dict):
+    product = ProductData(**{field: raw[key] for field, key in FIELDS.items()})
+    for _ in range(2): # prompt, cache key
+        product.json()
+    data = mock_faq_and_competitor(product.name, product.ingredients)
+    first = MutableQuestionOutput(product=product, product_b=ProductBData(**data["product_b"]),
+                                  questions=FAQData(**data["faq"]), iteration=1)
+
+    # EditorAgent as it was: the rejected draft is the first one, mutated in place
+    rejected = first
+    rejected.critique = "Need more Safety"
+    rejected.critique_items = [CritiqueItem(section="Safety", shortfall=1, message="Safety")]
+    rejected.iteration += 1
+    questions = rejected.questions.model_dump()
+    for item in REGENERATED["faq"]["Safety"]:
+        questions["Safety"].append(FAQItem(**item).model_dump())
+    output = QuestionOutput(product=rejected.product, product_b=rejected.product_b,
+                            questions=FAQData(**questions), iteration=rejected.iteration)
+
+    # TemplateAgent.bind as it was: one dump per model
+    product_d, prod_b, faq = output.product.model_dump(), output.product_b.model_dump(), output.questions.model_dump()
+    context = dict(product_d)
+    context["product_name"] = product_d["name"]
+    context.update({f"product_a_{key}": value for key, value in product_d.items()})
+    context.update({f"product_b_{key}": value for key, value in prod_b.items()})
+    context.update({f"{category.lower()}_questions": items for category, items in faq.items()})
+    context.update({
+        "ingredients_comparison": f"{product_d['name']} vs {prod_b['name']}",
+        "benefits_comparison": f"High potency vs {prod_b['benefits']}",
+        "price_comparison": f"{product_d['price']} vs {prod_b['price']}"
+    })
+    return first, rejected, output, context
+
+def shared(raw: dict):
+    product = ProductData(**{field: raw[key] for field, key in FIELDS.items()})
+    for _ in range(2): # prompt, cache key
+        product.model_dump_json()
+    data = mock_faq_and_competitor(product.name, product.ingredients)
+    first = QuestionOutput(product=product, product_b=ProductBData.model_validate(data["product_b"]),
+                           questions=FAQData.model_validate(data["faq"]), iteration=1)
+
+    rejected = first.model_copy(update={
+        "critique": "Need more Safety", "iteration": 2,
+        "critique_items": [CritiqueItem(section="Safety", shortfall=1, message="Safety")]
+    })
+    output = QuestionAgent._merge(rejected, REGENERATED)
+    return first, rejected, output, TemplateAgent.bind(output)
+
+def measure(fn, products: list, repeat: int) -> dict:
+    for raw in products[:50]: # warm up
+        fn(raw)
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for raw in products:
+            fn(raw)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    peaks, retained = [], []
+    for raw in products:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = fn(raw)
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - base)
+        retained.append(current - base)
+        del result
+    tracemalloc.stop()
+    return {
+        "us_per_product": round(best / len(products) * 1e6, 1),
+        "peak_bytes_per_product": round(sum(peaks) / len(peaks)),
+        "retained_bytes_per_product": round(sum(retained) / len(retained)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Pydantic fast path")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore", DeprecationWarning) # the validated path uses .json() on purpose
+    products = list(synthetic_products(args.products))
+    results = {name: measure(fn, products, args.repeat) for name, fn in (("validated", validated), ("shared", shared))}
+    for name, result in results.items():
+        print(f"{name}: {result['us_per_product']} us/product, peak {result['peak_bytes_per_product']} B, "
+              f"retained {result['retained_bytes_per_product']} B")
+    base, fast = results["validated"], results["shared"]
+    saved = {key: (1 - fast[key] / base[key]) * 100 for key in base}
+    print(f"savings: {saved['us_per_product']:.1f}% time, {saved['peak_bytes_per_product']:.1f}% peak, "
+          f"{saved['retained_bytes_per_product']:.1f}% retained")
+
+if __name__ == "__main__":
+    main()
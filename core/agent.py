@@ -1,18 +1,32 @@
 """
 Base Agent class (Async).
 """
+import asyncio
+
 from core.message import Message
 
 class Agent:
-    def __init__(self, name: str):
+    def __init__(self, name: str, concurrency: int = 1, inbox_size: int = 100):
         self.name = name
-        self.inbox = []
+        # Number of worker tasks the Orchestrator runs for this agent
+        self.concurrency = concurrency
+        # Bounded inbox: senders wait when this agent falls behind (backpressure)
+        self.inbox = asyncio.Queue(maxsize=inbox_size)
+        self.metrics = None
+
+    def bind_metrics(self, metrics):
+        """Called by the Orchestrator on register; agents may add their own counters/gauges."""
+        self.metrics = metrics
 
     async def receive(self, message: Message):
-        self.inbox.append(message)
+        await self.inbox.put(message)
 
     async def think(self, message: Message):
         raise NotImplementedError
 
     async def act(self, result) -> Message:
         raise NotImplementedError
+
+    async def close(self):
+        """Called once by the Orchestrator on shutdown (flush buffers, release resources)."""
+        pass
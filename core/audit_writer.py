@@ -0,0 +1,77 @@
+"""
+Append-only JSONL writer with batched, non-blocking flushes.
+Entries are buffered in memory and written by a background task
+(file I/O runs in a worker thread) when the batch fills up or the
+flush interval elapses. Files are rotated once they exceed `max_bytes`.
+"""
+import asyncio
+import json
+import os
+
+class AuditWriter:
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 1.0,
+                 max_bytes: int = 50 * 1024 * 1024, backups: int = 5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._buffer = []
+        self._wake = None
+        self._task = None
+        self._closing = False
+
+    def write(self, entry: dict):
+        """Queues one entry; never blocks the event loop."""
+        self._buffer.append(entry)
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._append, batch)
+
+    def _append(self, batch):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self._rotate()
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def _rotate(self):
+        # audit.jsonl -> audit.jsonl.1 -> audit.jsonl.2 ... (oldest dropped)
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    async def close(self):
+        """Stops the background task and flushes whatever is still buffered."""
+        self._closing = True
+        if self._task is not None:
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        self._closing = False
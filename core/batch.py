@@ -0,0 +1,238 @@
+"""
+Batch catalog mode.
+Streams products from a JSONL file or a JSON array and pushes each one
+through the agent graph with a bounded number of products in flight.
+With `prevalidate`, products are first checked a chunk at a time by
+DataValidationAgent.validate_chunk: rejected rows never enter the graph
+(they are summarized as "invalid" and collected by `validation_report`)
+and valid rows start at ParserAgent.
+"""
+import asyncio
+import itertools
+import json
+import uuid
+from collections import Counter
+from typing import Iterable, Iterator, Optional
+
+from core.message import Message
+from core.run_journal import DONE, RunJournal
+
+CHUNK_SIZE = 64 * 1024
+
+def iter_products(path: str) -> Iterator[dict]:
+    """
+    Yields product dicts one at a time without loading the whole file.
+    Accepts JSONL (one object per line), a top-level JSON array of objects,
+    or a single JSON object.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        eof = False
+        in_array = None
+        while True:
+            # Skip whitespace and array separators between objects
+            buf = buf.lstrip(" \t\r\n,")
+            if in_array is None and buf:
+                in_array = buf[0] == "["
+                if in_array:
+                    buf = buf[1:]
+                    continue
+            if in_array and buf.startswith("]"):
+                return
+
+            if buf:
+                try:
+                    obj, end = decoder.raw_decode(buf)
+                except json.JSONDecodeError:
+                    # Incomplete object at the end of the buffer
+                    if eof:
+                        raise
+                else:
+                    buf = buf[end:]
+                    yield obj
+                    continue
+            elif eof:
+                return
+
+            chunk = f.read(CHUNK_SIZE)
+            eof = not chunk
+            buf += chunk
+
+def _summarize(correlation_id: str, raw: dict, trace: dict) -> dict:
+    hops = trace["hops"]
+    if trace["errors"]:
+        status = "error"
+    elif ("TemplateAgent", "OutputAgent") in hops:
+        status = "ok"
+    elif ("DataValidationAgent", "OutputAgent") in hops:
+        status = "invalid"
+    else:
+        status = "incomplete"
+    return {
+        "correlation_id": correlation_id,
+        "product": product_name(raw),
+        "status": status,
+        "iterations": hops.count(("QuestionAgent", "EditorAgent")),
+        "elapsed_ms": round(trace["elapsed"] * 1000, 2),
+        "errors": trace["errors"],
+    }
+
+def product_name(raw) -> Optional[str]:
+    return raw.get("Product Name") if isinstance(raw, dict) else None
+
+def _row_summary(index: int, raw, status: str, **extra) -> dict:
+    """Summary of a row that never entered the graph."""
+    return {
+        "correlation_id": f"{index:06d}-{uuid.uuid4().hex[:8]}",
+        "product": product_name(raw),
+        "status": status, "iterations": 0, "elapsed_ms": 0.0, "errors": [], **extra,
+    }
+
+def _checked(products: Iterable[dict], validator, chunk_size: int) -> Iterator[tuple]:
+    """(raw, missing fields or None) per product; with a validator, checked `chunk_size` rows at a time."""
+    if validator is None:
+        for raw in products:
+            yield raw, None
+        return
+    products = iter(products)
+    for chunk in iter(lambda: list(itertools.islice(products, chunk_size)), []):
+        rejected = validator.validate_chunk(chunk)
+        for i, raw in enumerate(chunk):
+            yield raw, rejected.get(i)
+
+def validation_report(summaries: list) -> dict:
+    """One compact report of the rows rejected by pre-validation (instead of an error page per product)."""
+    rejected = [s for s in summaries if "missing" in s]
+    return {
+        "checked": sum(s["status"] not in ("skipped", "duplicate") for s in summaries),
+        "rejected": len(rejected),
+        "missing_by_field": dict(Counter(field for s in rejected for field in s["missing"])),
+        "rows": [{"index": int(s["correlation_id"].split("-", 1)[0]), "product": s["product"], "missing": s["missing"]}
+                 for s in rejected],
+    }
+
+class _Completion:
+    """
+    Marks a product done in the journal only once its trace has finished
+    and the output sink has written its pages, in whichever order the two
+    happen (NDJSONSink buffers records until its next flush).
+    """
+    FINISHED = ("ok", "invalid")
+
+    def __init__(self, journal, sink):
+        self.journal = journal
+        self.traced = {}   # key -> (product, status), pages not written yet
+        self.written = set()
+        self.immediate = not hasattr(sink, "add_listener")
+        if not self.immediate:
+            sink.add_listener(self.pages_written)
+
+    def pages_written(self, keys: list):
+        for key in keys:
+            if key in self.traced:
+                self.journal.finish(key, *self.traced.pop(key))
+            else:
+                self.written.add(key)
+
+    def trace_finished(self, key: str, product, status: str):
+        if status not in self.FINISHED:
+            self.written.discard(key)
+        elif self.immediate or key in self.written:
+            self.written.discard(key)
+            self.journal.finish(key, product, status)
+        else:
+            self.traced[key] = (product, status)
+
+async def _start_message(raw, metadata: dict, journal, resume: bool, entry: str = "InputAgent") -> Optional[Message]:
+    """`entry` message for a new product, the last checkpoint when resuming, None if already done."""
+    checkpoint = await asyncio.to_thread(journal.checkpoint, metadata["product_key"]) if resume else None
+    if checkpoint is None:
+        return Message(sender="SYSTEM", receiver=entry, payload=raw, metadata=metadata)
+    if checkpoint["stage"] == DONE:
+        return None
+    metadata["product"] = checkpoint["product"]
+    return Message(sender="SYSTEM", receiver=checkpoint["stage"], payload=checkpoint["payload"], metadata=metadata)
+
+async def run_catalog(orchestrator, products: Iterable[dict], max_in_flight: int = 8,
+                      journal=None, resume: bool = False, start: int = 0, step: int = 1,
+                      prevalidate: int = 0, duplicates: Optional[dict] = None) -> list:
+    """
+    Feeds every product to InputAgent, keeping at most `max_in_flight`
+    products inside the graph at once. Each product carries its own
+    `correlation_id` in Message.metadata.
+    Keep `max_in_flight` below the agents' inbox size so the
+    QuestionAgent <-> EditorAgent loop can never fill both inboxes.
+    With a RunJournal every product is checkpointed and marked done once
+    its pages are written by the output sink; `resume=True` skips finished products and restarts the others
+    from their last checkpoint.
+    `start` / `step` number the products when this is one shard of a
+    larger catalog (product i of the shard is catalog index start + i * step).
+    `prevalidate` > 0 validates the catalog in chunks of that many rows
+    before routing; rejected rows are neither routed nor journaled.
+    A row whose "Product Name" already appeared earlier in the catalog would
+    overwrite that product's pages, so it is not routed either and is
+    summarized as "duplicate" with `duplicate_of` (the first row's index).
+    `duplicates` ({catalog index: first index}) replaces the in-process
+    check when the coordinator of a sharded run found them.
+    Returns one summary dict per product, in input order.
+    """
+    slots = asyncio.Semaphore(max_in_flight)
+    summaries = []
+    tasks = []
+    validator = orchestrator.agents["DataValidationAgent"] if prevalidate else None
+    entry = "InputAgent" if validator is None else "ParserAgent"
+
+    async def run_one(index, raw):
+        correlation_id = f"{index:06d}-{uuid.uuid4().hex[:8]}"
+        try:
+            # product_key also keys the NDJSON index, with or without a journal
+            metadata = {"correlation_id": correlation_id, "product_key": RunJournal.key(raw)}
+            if journal is None:
+                message = Message(sender="SYSTEM", receiver=entry, payload=raw, metadata=metadata)
+            else:
+                message = await _start_message(raw, metadata, journal, resume, entry)
+                if message is None:
+                    summaries.append((index, {**_row_summary(index, raw, "skipped"), "correlation_id": correlation_id}))
+                    return
+
+            trace = await orchestrator.submit(message)
+            summary = _summarize(correlation_id, raw, trace)
+            if journal is not None:
+                if message.receiver != entry:
+                    summary["resumed_from"] = message.receiver
+                completion.trace_finished(message.metadata["product_key"], summary["product"], summary["status"])
+            summaries.append((index, summary))
+        finally:
+            slots.release()
+
+    if journal is not None:
+        if not resume:
+            await asyncio.to_thread(journal.reset)
+        orchestrator.add_observer(journal)
+        completion = _Completion(journal, getattr(orchestrator.agents.get("OutputAgent"), "sink", None))
+    first_rows = {}  # product name -> index of its first row
+    orchestrator.start_workers()
+    for position, (raw, missing) in enumerate(_checked(products, validator, prevalidate)):
+        index = start + position * step
+        if duplicates is not None:
+            first = duplicates.get(index, index)
+        else:
+            name = product_name(raw)
+            first = first_rows.setdefault(name, index) if name else index
+        if first != index:
+            summaries.append((index, _row_summary(index, raw, "duplicate", duplicate_of=first)))
+            continue
+        if missing:
+            summaries.append((index, _row_summary(index, raw, "invalid", missing=missing)))
+            continue
+        await slots.acquire()
+        tasks.append(asyncio.create_task(run_one(index, raw)))
+        # Drop finished tasks so memory stays flat on large catalogs
+        if len(tasks) >= 4 * max_in_flight:
+            tasks = [t for t in tasks if not t.done()]
+
+    await asyncio.gather(*tasks)
+    await orchestrator.drain()
+    summaries.sort(key=lambda item: item[0])
+    return [summary for _, summary in summaries]
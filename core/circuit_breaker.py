@@ -0,0 +1,38 @@
+"""
+Per-key circuit breaker (e.g. one circuit per LLM model name).
+After `failure_threshold` consecutive failures the circuit opens and the
+key is skipped for `reset_timeout` seconds; then a single trial call is
+let through (half-open) and its outcome closes or re-opens the circuit.
+"""
+import time
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}
+        self._open_until = {}
+
+    def allow(self, key: str) -> bool:
+        open_until = self._open_until.get(key)
+        if open_until is None:
+            return True
+        now = time.monotonic()
+        if now < open_until:
+            return False
+        # Half-open: let this caller through, keep everyone else out meanwhile
+        self._open_until[key] = now + self.reset_timeout
+        return True
+
+    def record_success(self, key: str):
+        self._failures.pop(key, None)
+        self._open_until.pop(key, None)
+
+    def record_failure(self, key: str):
+        failures = self._failures.get(key, 0) + 1
+        self._failures[key] = failures
+        if failures >= self.failure_threshold:
+            self._open_until[key] = time.monotonic() + self.reset_timeout
+
+    def is_open(self, key: str) -> bool:
+        return time.monotonic() < self._open_until.get(key, 0)
@@ -0,0 +1,215 @@
+"""
+Catalog-wide FAQ reuse index (SQLite).
+Learns product-agnostic Q&As from generated FAQs: a Q&A whose question and
+answer mention none of the product's name, price, concentration or
+ingredients (except the ingredient the question is scoped to) is stored
+under its category and a scope, which is the first ingredient or the skin
+type of the product the question mentions (or "" when it mentions neither).
+Near-duplicate Q&As ("Is the packaging recyclable?" / "Is your packaging
+recyclable?" with the same answer) are folded into one entry with a 64-bit
+SimHash of the canonical question and of the canonical answer (lowercased,
+stopwords and plural "s" dropped), stored as four 16-bit bands each: two
+hashes within MAX_DISTANCE bits share at least one band, so a lookup only
+compares the rows matching a question band. The same question with a
+different answer is a separate entry.
+An entry is reused once it has been generated for `min_products` different
+products; `lookup` returns those for a product's scopes.
+Both are blocking and thread-safe; QuestionAgent runs them with
+`asyncio.to_thread`.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+MAX_DISTANCE = 3
+BANDS = 4
+BAND_BITS = 64 // BANDS
+SCHEMA_VERSION = 2
+STOPWORDS = frozenset(
+    "a an the is are do does can i my your you we our it this that "
+    "of to for in on with and or be will should how what".split()
+)
+
+def normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w]+", " ", text.lower()).split())
+
+def canonical(text: str) -> str:
+    words = [w for w in normalize(text).split() if w not in STOPWORDS]
+    return " ".join(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words)
+
+def simhash(text: str) -> int:
+    """SimHash over character trigrams, so a small spelling difference flips only a few bits."""
+    padded = f" {text} "
+    weights = [0] * 64
+    for i in range(max(len(padded) - 2, 1)):
+        h = int.from_bytes(hashlib.blake2b(padded[i:i + 3].encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def _mentions(text: str, phrase: str) -> bool:
+    """Whole-word match on normalized text."""
+    return f" {phrase} " in f" {text} "
+
+def _bands(value: int) -> list:
+    mask = (1 << BAND_BITS) - 1
+    return [value >> (band * BAND_BITS) & mask for band in range(BANDS)]
+
+def _distance(a: list, b: list) -> int:
+    return sum(bin(x ^ y).count("1") for x, y in zip(a, b))
+
+class FAQIndex:
+    def __init__(self, path: str = os.path.join("cache", "faq_index.sqlite3"), min_products: int = 2):
+        self.path = path
+        self.min_products = min_products
+        self.stats = {"lookups": 0, "hits": 0, "reused_items": 0, "learned": 0, "near_duplicates": 0}
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Older entries were folded on the question alone and may hold product-specific answers
+                self._conn.execute("DROP TABLE IF EXISTS entries")
+                self._conn.execute("DROP TABLE IF EXISTS sightings")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            # b0..b3: question SimHash bands, a0..a3: answer SimHash bands
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " id INTEGER PRIMARY KEY, category TEXT NOT NULL, scope TEXT NOT NULL,"
+                " q TEXT NOT NULL, a TEXT NOT NULL, b0 INTEGER, b1 INTEGER, b2 INTEGER, b3 INTEGER,"
+                " a0 INTEGER, a1 INTEGER, a2 INTEGER, a3 INTEGER, created REAL NOT NULL)"
+            )
+            for band in range(BANDS):
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS entries_b{band} ON entries (category, scope, b{band})")
+            # One row per product that generated the entry (or a near-duplicate of it)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sightings (entry INTEGER NOT NULL, product TEXT NOT NULL,"
+                " PRIMARY KEY (entry, product))"
+            )
+        return self._conn
+
+    @staticmethod
+    def _scopes(product) -> list:
+        """Most specific first: ingredients, then skin type, then catalog-wide."""
+        ingredients = [normalize(i) for i in product.ingredients.split(",") if normalize(i)]
+        return [f"ingredient:{i}" for i in ingredients] + [f"skin:{normalize(product.skin_type)}", ""]
+
+    @staticmethod
+    def _specifics(product) -> list:
+        """Normalized values that tie a Q&A to this product."""
+        values = [product.name, product.price, product.concentration] + product.ingredients.split(",")
+        return [value for value in map(normalize, values) if value]
+
+    def _scope_of(self, product, text: str) -> str:
+        for scope in self._scopes(product):
+            if scope and _mentions(text, scope.split(":", 1)[1]):
+                return scope
+        return ""
+
+    def learn(self, product, questions, categories: Iterable[str], reused: dict = None) -> int:
+        """
+        Records the product-agnostic Q&As of `questions` (FAQData) in
+        `categories`, except those that came from this index (`reused`, as
+        returned by `lookup`). Returns the number of new entries.
+        """
+        known = {normalize(item["q"]) for items in (reused or {}).values() for item in items}
+        with self._lock:
+            added = self._learn(self._db(), product, questions, categories, known)
+        self.stats["learned"] += added
+        return added
+
+    def _learn(self, db, product, questions, categories: Iterable[str], known: set) -> int:
+        name = normalize(product.name)
+        specifics = self._specifics(product)
+        added = 0
+        for category in categories:
+            for item in getattr(questions, category, []):
+                q, a = normalize(item.q), normalize(item.a)
+                if not q or q in known:
+                    continue
+                scope = self._scope_of(product, q)
+                allowed = scope.split(":", 1)[1] if scope.startswith("ingredient:") else None
+                if any(_mentions(text, value) for text in (q, a) for value in specifics if value != allowed):
+                    continue
+                bands = _bands(simhash(canonical(q)))
+                answer_bands = _bands(simhash(canonical(a)))
+                entry = self._near_duplicate(db, category, scope, bands, answer_bands)
+                if entry is None:
+                    entry = db.execute(
+                        "INSERT INTO entries (category, scope, q, a, b0, b1, b2, b3, a0, a1, a2, a3, created)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (category, scope, item.q, item.a, *bands, *answer_bands, time.time())
+                    ).lastrowid
+                    added += 1
+                else:
+                    self.stats["near_duplicates"] += 1
+                db.execute("INSERT OR IGNORE INTO sightings (entry, product) VALUES (?, ?)", (entry, name))
+        db.commit()
+        return added
+
+    @staticmethod
+    def _near_duplicate(db, category: str, scope: str, bands: list, answer_bands: list):
+        rows = db.execute(
+            "SELECT id, b0, b1, b2, b3, a0, a1, a2, a3 FROM entries WHERE category = ? AND scope = ?"
+            " AND (b0 = ? OR b1 = ? OR b2 = ? OR b3 = ?)",
+            (category, scope, *bands)
+        ).fetchall()
+        for entry, *other in rows:
+            if (_distance(bands, other[:BANDS]) <= MAX_DISTANCE
+                    and _distance(answer_bands, other[BANDS:]) <= MAX_DISTANCE):
+                return entry
+        return None
+
+    def lookup(self, product, categories: Iterable[str], per_category: int) -> dict:
+        """{category: [{"q", "a"}]} with up to `per_category` reusable Q&As each; empty categories are omitted."""
+        categories = list(categories)
+        self.stats["lookups"] += 1
+        if not categories:
+            return {}
+        scopes = self._scopes(product)
+        rank = {scope: i for i, scope in enumerate(scopes)}
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT e.category, e.scope, e.q, e.a, e.b0, e.b1, e.b2, e.b3, COUNT(*) AS seen"
+                f" FROM entries e JOIN sightings s ON s.entry = e.id"
+                f" WHERE e.category IN ({','.join('?' * len(categories))}) AND e.scope IN ({','.join('?' * len(scopes))})"
+                f" GROUP BY e.id HAVING seen >= ?",
+                (*categories, *scopes, self.min_products)
+            ).fetchall()
+        # Product-scoped entries first, then the most widely seen
+        rows.sort(key=lambda row: (rank[row[1]], -row[8]))
+
+        reused = {}
+        kept = {}
+        for category, _, q, a, *bands_seen in rows:
+            bands = bands_seen[:BANDS]
+            chosen = reused.setdefault(category, [])
+            if len(chosen) >= per_category:
+                continue
+            # The same question may exist in several scopes
+            if any(_distance(bands, other) <= MAX_DISTANCE for other in kept.get(category, [])):
+                continue
+            kept.setdefault(category, []).append(bands)
+            chosen.append({"q": q, "a": a})
+        reused = {category: items for category, items in reused.items() if items}
+        if reused:
+            self.stats["hits"] += 1
+            self.stats["reused_items"] += sum(len(items) for items in reused.values())
+        return reused
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,122 @@
+"""
+Content-addressed response cache for LLM generations (SQLite).
+Entries are keyed by a SHA-256 of the model name, the rendered prompt and
+the input data, expire after `ttl` seconds and are evicted least-recently-used
+once the cache grows past `max_entries`.
+Reads do not write: hit timestamps and expired keys are collected and
+applied in one transaction every TOUCH_BATCH hits (or on the next put /
+close). Methods are thread-safe, so callers on the event loop run them
+with `asyncio.to_thread`.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+class ResponseCache:
+    EVICT_CHECK_EVERY = 64
+    TOUCH_BATCH = 64
+
+    def __init__(self, path: str = os.path.join("cache", "llm_responses.sqlite3"),
+                 ttl: float = 7 * 24 * 3600, max_entries: int = 100_000, bypass: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._conn = None
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last access time, not yet written
+        self._expired = set()
+
+    @staticmethod
+    def key(model_name: str, prompt: str, data: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model_name, prompt, data):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _db(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        if self.bypass:
+            return None
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                if row is not None:
+                    self._expired.add(key)
+                self.stats["misses"] += 1
+                return None
+            self._touched[key] = now
+            self.stats["hits"] += 1
+            if len(self._touched) + len(self._expired) >= self.TOUCH_BATCH:
+                self._flush_touched(db)
+                db.commit()
+            return row[0]
+
+    def put(self, key: str, value: str):
+        if self.bypass:
+            return
+        with self._lock:
+            db = self._db()
+            now = time.time()
+            self._touched.pop(key, None)
+            self._expired.discard(key)
+            self._flush_touched(db)
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self.stats["writes"] += 1
+            # Counting rows is a table scan, so only check the size periodically
+            if (self.stats["writes"] - 1) % self.EVICT_CHECK_EVERY == 0:
+                self._evict(db)
+            db.commit()
+
+    def _flush_touched(self, db):
+        if self._touched:
+            db.executemany("UPDATE responses SET accessed = ? WHERE key = ?",
+                           [(accessed, key) for key, accessed in self._touched.items()])
+            self._touched = {}
+        if self._expired:
+            db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in self._expired])
+            self._expired = set()
+
+    def _evict(self, db):
+        count = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            # Drop a little extra so eviction does not run on every check
+            cur = db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (overflow + self.max_entries // 10,)
+            )
+            self.stats["evictions"] += cur.rowcount
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touched(self._conn)
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,44 @@
+"""
+Shared Gemini client/model pool.
+The SDK is imported and configured lazily on the first real model request
+(keeping mock-mode and short CLI runs free of the grpc/protobuf import cost),
+then configured once per process; model handles are cached by name, so
+concurrent QuestionAgent calls reuse the same objects.
+"""
+import threading
+
+class GeminiPool:
+    _shared = {}
+    _lock = threading.Lock()
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._genai = None
+        self._models = {}
+
+    @classmethod
+    def shared(cls, api_key: str) -> "GeminiPool":
+        """One pool per API key per process."""
+        with cls._lock:
+            pool = cls._shared.get(api_key)
+            if pool is None:
+                pool = cls._shared[api_key] = cls(api_key)
+            return pool
+
+    def _sdk(self):
+        if self._genai is None:
+            with self._lock:
+                if self._genai is None:
+                    import warnings
+                    # Suppress warnings from deprecated google-generativeai package
+                    warnings.filterwarnings("ignore", category=FutureWarning)
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._genai = genai
+        return self._genai
+
+    def model(self, model_name: str):
+        model = self._models.get(model_name)
+        if model is None:
+            model = self._models[model_name] = self._sdk().GenerativeModel(model_name)
+        return model
@@ -0,0 +1,115 @@
+"""
+Dedicated execution layer for blocking LLM SDK calls.
+- Own bounded thread pool (does not compete with the loop's default executor)
+- Token-bucket rate limiting on requests/min and tokens/min
+- Per-call timeout, counted from when a pool thread picks the call up (time
+  spent queued behind other calls does not count). Python threads cannot be
+  interrupted: a timed-out call keeps its thread, and its slot, until it returns
+- Exponential backoff with jitter on 429 / 5xx / timeouts
+Works with any blocking callable, so a local fake model can stand in for Gemini.
+"""
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+    "InternalServerError", "DeadlineExceeded"
+}
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    for attr in ("code", "status_code"):
+        status = getattr(error, attr, None)
+        try:
+            if int(status) in RETRYABLE_STATUS:
+                return True
+        except (TypeError, ValueError):
+            pass
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` units per second."""
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+class LLMExecutor:
+    def __init__(self, max_workers: int = 4, requests_per_minute: float = 60,
+                 tokens_per_minute: float = 0, timeout: float = 60.0, max_retries: int = 3,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        # One slot per pool thread, released when the thread is done (not when the caller gives up)
+        self._slots = asyncio.Semaphore(max_workers)
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.stats = {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0}
+
+    @classmethod
+    def from_settings(cls, settings) -> "LLMExecutor":
+        return cls(
+            max_workers=settings.llm_workers,
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute,
+            timeout=settings.llm_timeout,
+            max_retries=settings.llm_max_retries,
+        )
+
+    async def call(self, fn, *args, estimated_tokens: int = 0):
+        """Runs `fn(*args)` on the LLM pool under rate limits, timeout and retry policy."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            if self._requests:
+                await self._requests.acquire(1)
+            if self._tokens and estimated_tokens:
+                await self._tokens.acquire(estimated_tokens)
+            await self._slots.acquire()
+            self.stats["calls"] += 1
+            try:
+                future = loop.run_in_executor(self._pool, fn, *args)
+            except BaseException:
+                self._slots.release()
+                raise
+            future.add_done_callback(lambda _: self._slots.release())
+            try:
+                # shield: on timeout the pool future stays pending until the thread returns
+                return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats["timeouts"] += 1
+                if attempt == self.max_retries or not is_retryable(e):
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                # Full jitter so concurrent callers do not retry in lockstep
+                await asyncio.sleep(random.uniform(0, delay))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+def estimate_tokens(text: str, expected_output: int = 1500) -> int:
+    """Rough prompt size (~4 chars/token) plus the expected completion size."""
+    return len(text) // 4 + expected_output
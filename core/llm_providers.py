@@ -0,0 +1,302 @@
+"""
+LLM provider interface used by QuestionAgent.
+A provider exposes blocking `generate`, `stream` and `batch` calls (they run
+on the LLMExecutor's threads), so the agent never touches an SDK directly.
+
+- GeminiProvider: google.generativeai via the shared GeminiPool
+- FakeProvider: in-process, deterministic stand-in with configurable latency,
+  error / malformed-response rates and token counts; answers full and
+  partial (EditorAgent critique) prompts with mock content
+- HTTPProvider: client for a provider served over HTTP, e.g. the fake one:
+      python -m core.llm_providers --port 8089 --latency 0.2 --error-rate 0.05
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional
+
+from core.mock_content import mock_faq_and_competitor
+
+class ProviderError(Exception):
+    """Failed provider call; `code` is an HTTP-style status (429/5xx are retried by LLMExecutor)."""
+    def __init__(self, code: int, message: str = ""):
+        super().__init__(f"{code} {message}".strip())
+        self.code = code
+
+class LLMResponse:
+    def __init__(self, text: str, model: str, input_tokens: int = 0, output_tokens: int = 0):
+        self.text = text
+        self.model = model
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "model": self.model,
+                "input_tokens": self.input_tokens, "output_tokens": self.output_tokens}
+
+class LLMProvider:
+    name = "base"
+
+    def generate(self, model: str, prompt: str) -> LLMResponse:
+        raise NotImplementedError
+
+    def stream(self, model: str, prompt: str) -> Iterator[str]:
+        """Text chunks as they are produced; defaults to one chunk."""
+        yield self.generate(model, prompt).text
+
+    def batch(self, model: str, prompts: List[str]) -> List[LLMResponse]:
+        return [self.generate(model, prompt) for prompt in prompts]
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    @staticmethod
+    def _usage(response):
+        usage = getattr(response, "usage_metadata", None)
+        return (getattr(usage, "prompt_token_count", 0) or 0,
+                getattr(usage, "candidates_token_count", 0) or 0)
+
+    def generate(self, model: str, prompt: str) -> LLMResponse:
+        response = self.pool.model(model).generate_content(prompt)
+        input_tokens, output_tokens = self._usage(response)
+        return LLMResponse(response.text, model, input_tokens, output_tokens)
+
+    def stream(self, model: str, prompt: str) -> Iterator[str]:
+        for chunk in self.pool.model(model).generate_content(prompt, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+PRODUCT_JSON = re.compile(r'\{"name":.*?\}')
+PARTIAL_FAQ = re.compile(r"- faq\.(\w+): (\d+) NEW")
+BATCH_PRODUCT = re.compile(r'^\s*\[(P\d+)\] (\{"name":.*?\})', re.MULTILINE)
+
+class FakeProvider(LLMProvider):
+    """
+    Sleeps `latency + output_tokens * per_token_latency` per call, fails with
+    `error_code` at `error_rate` and returns unparsable text at
+    `malformed_rate`. Outcomes come from a seeded RNG, so a run with the same
+    call order is reproducible. `faq_per_category` below 3 makes the
+    EditorAgent reject first drafts and exercises partial regeneration.
+    Multi-product prompts ("[P0] {...}" listings) get a keyed JSON array.
+    """
+    name = "fake"
+
+    def __init__(self, latency: float = 0.05, per_token_latency: float = 0.0,
+                 error_rate: float = 0.0, error_code: int = 503, malformed_rate: float = 0.0,
+                 output_tokens: Optional[int] = None, faq_per_category: int = 3,
+                 chunk_chars: int = 64, seed: int = 0):
+        self.latency = latency
+        self.per_token_latency = per_token_latency
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.malformed_rate = malformed_rate
+        self.output_tokens = output_tokens
+        self.faq_per_category = faq_per_category
+        self.chunk_chars = chunk_chars
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "errors": 0, "malformed": 0, "input_tokens": 0, "output_tokens": 0}
+
+    def _answer(self, prompt: str):
+        batch = BATCH_PRODUCT.findall(prompt)
+        if batch:
+            return [{"id": key, **self._product_answer(prompt, json.loads(product))} for key, product in batch]
+        match = PRODUCT_JSON.search(prompt)
+        return self._product_answer(prompt, json.loads(match.group(0)) if match else {})
+
+    def _product_answer(self, prompt: str, product: dict) -> dict:
+        name = product.get("name", "Product")
+        mock = mock_faq_and_competitor(name, product.get("ingredients", ""))
+
+        wanted = PARTIAL_FAQ.findall(prompt)
+        if wanted or "- product_b:" in prompt:
+            answer = {"faq": {}}
+            for section, count in wanted:
+                answer["faq"][section] = [
+                    {"q": f"What else should I know about {name} ({section.lower()} #{i + 1})?",
+                     "a": f"Additional {section.lower()} guidance for {name}."}
+                    for i in range(int(count))
+                ]
+            if "- product_b:" in prompt:
+                answer["product_b"] = {**mock["product_b"], "name": f"{name} Rival B",
+                                       "benefits": "Budget hydration with a lighter texture"}
+            return answer
+
+        # Extra questions beyond the three canned ones get distinct wording so they are not deduped
+        mock["faq"] = {
+            section: [
+                items[i] if i < len(items) else
+                {"q": f"{items[i % len(items)]['q'][:-1]} (detail {i - len(items) + 1})?", "a": items[i % len(items)]["a"]}
+                for i in range(self.faq_per_category)
+            ]
+            for section, items in mock["faq"].items()
+        }
+        return mock
+
+    def _roll(self, prompt: str):
+        with self._lock:
+            self.stats["calls"] += 1
+            fail = self._rng.random() < self.error_rate
+            malformed = not fail and self._rng.random() < self.malformed_rate
+            if fail:
+                self.stats["errors"] += 1
+            if malformed:
+                self.stats["malformed"] += 1
+        if fail:
+            time.sleep(self.latency)
+            raise ProviderError(self.error_code, "fake provider error")
+
+        text = json.dumps(self._answer(prompt), ensure_ascii=False)
+        if malformed:
+            text = text[:len(text) // 2]
+        input_tokens = len(prompt) // 4
+        output_tokens = self.output_tokens if self.output_tokens is not None else len(text) // 4
+        with self._lock:
+            self.stats["input_tokens"] += input_tokens
+            self.stats["output_tokens"] += output_tokens
+        return text, input_tokens, output_tokens
+
+    def generate(self, model: str, prompt: str) -> LLMResponse:
+        text, input_tokens, output_tokens = self._roll(prompt)
+        time.sleep(self.latency + output_tokens * self.per_token_latency)
+        return LLMResponse(text, model, input_tokens, output_tokens)
+
+    def stream(self, model: str, prompt: str) -> Iterator[str]:
+        text, _, output_tokens = self._roll(prompt)
+        chunks = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+        time.sleep(self.latency)
+        per_chunk = output_tokens * self.per_token_latency / len(chunks)
+        for chunk in chunks:
+            if per_chunk:
+                time.sleep(per_chunk)
+            yield chunk
+
+class HTTPProvider(LLMProvider):
+    """
+    Talks to `serve()`-style endpoints: POST /generate and /batch return JSON,
+    POST /stream returns newline-delimited {"text": chunk} objects.
+    """
+    name = "http"
+
+    def __init__(self, url: str, timeout: float = 60.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path: str, body: dict):
+        request = urllib.request.Request(
+            f"{self.url}{path}", data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            raise ProviderError(e.code, e.read().decode("utf-8", "replace")) from None
+
+    def generate(self, model: str, prompt: str) -> LLMResponse:
+        with self._post("/generate", {"model": model, "prompt": prompt}) as response:
+            return LLMResponse(**json.load(response))
+
+    def stream(self, model: str, prompt: str) -> Iterator[str]:
+        with self._post("/stream", {"model": model, "prompt": prompt}) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)["text"]
+
+    def batch(self, model: str, prompts: List[str]) -> List[LLMResponse]:
+        with self._post("/batch", {"model": model, "prompts": prompts}) as response:
+            return [LLMResponse(**item) for item in json.load(response)]
+
+def serve(provider: LLMProvider, host: str = "127.0.0.1", port: int = 8089) -> ThreadingHTTPServer:
+    """HTTP front for any provider; call `serve_forever()` (or run it in a thread)."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            try:
+                if self.path == "/generate":
+                    result = provider.generate(body["model"], body["prompt"]).to_dict()
+                    self._send(200, json.dumps(result).encode("utf-8"))
+                elif self.path == "/batch":
+                    result = [r.to_dict() for r in provider.batch(body["model"], body["prompts"])]
+                    self._send(200, json.dumps(result).encode("utf-8"))
+                elif self.path == "/stream":
+                    chunks = provider.stream(body["model"], body["prompt"])
+                    first = next(chunks, "") # surfaces injected errors before the 200 is sent
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.end_headers()
+                    for chunk in _chain(first, chunks):
+                        self.wfile.write(json.dumps({"text": chunk}).encode("utf-8") + b"\n")
+                        self.wfile.flush()
+                    self.close_connection = True
+                else:
+                    self._send(404, b'{"error": "not found"}')
+            except ProviderError as e:
+                self._send(e.code, json.dumps({"error": str(e)}).encode("utf-8"))
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+def _chain(first: str, rest: Iterator[str]) -> Iterator[str]:
+    if first:
+        yield first
+    yield from rest
+
+def provider_from_settings(settings) -> Optional[LLMProvider]:
+    """Provider selected by LLM_PROVIDER; None means mock mode (no usable Gemini key)."""
+    if settings.llm_provider == "fake":
+        return FakeProvider(latency=settings.fake_llm_latency, error_rate=settings.fake_llm_error_rate)
+    if settings.llm_provider == "http":
+        return HTTPProvider(settings.llm_provider_url, timeout=settings.llm_timeout)
+    if settings.use_mock:
+        return None
+    from core.llm_client import GeminiPool
+    return GeminiProvider(GeminiPool.shared(settings.gemini_api_key))
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the fake LLM provider over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per call")
+    parser.add_argument("--per-token-latency", type=float, default=0.0, help="extra seconds per output token")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-code", type=int, default=503)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--output-tokens", type=int, help="reported output tokens per call (default: len/4)")
+    parser.add_argument("--faq-per-category", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    provider = FakeProvider(
+        latency=args.latency, per_token_latency=args.per_token_latency, error_rate=args.error_rate,
+        error_code=args.error_code, malformed_rate=args.malformed_rate, output_tokens=args.output_tokens,
+        faq_per_category=args.faq_per_category, seed=args.seed
+    )
+    server = serve(provider, args.host, args.port)
+    print(f"Fake LLM provider on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
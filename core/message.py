@@ -10,3 +10,5 @@ class Message:
         self.receiver = receiver
         self.payload = payload
         self.metadata = metadata or {}
+        # Set by the Orchestrator on delivery (queue wait time metrics)
+        self.enqueued_at = None
@@ -0,0 +1,194 @@
+"""
+In-process metrics for the Orchestrator and agents.
+- Counters and latency histograms keyed by metric name + labels
+- Gauges computed on demand (e.g. current inbox depth)
+- `snapshot()` for in-process inspection, `to_prometheus()` for text export
+- `state()` / `merge()` to combine metrics from sharded worker processes
+- MetricsExporter: periodic Prometheus text file and/or a local HTTP endpoint
+"""
+import asyncio
+import bisect
+import os
+from collections import defaultdict
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_value(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    items = key + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+class Metrics:
+    BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self.counters = defaultdict(float)  # (name, labels) -> value
+        self.histograms = {}                # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.peaks = defaultdict(float)     # (name, labels) -> max observed value
+        self._gauges = {}                   # name -> fn() -> [(labels, value), ...]
+        self.merged_gauges = {}             # (name, labels) -> value, from merged worker states
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        self.counters[(name, _labels_key(labels))] += amount
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, _labels_key(labels))
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = [0] * (len(self.BUCKETS) + 1) + [0.0]
+        hist[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        hist[-1] += seconds
+
+    def peak(self, name: str, value: float, **labels):
+        key = (name, _labels_key(labels))
+        if value > self.peaks[key]:
+            self.peaks[key] = value
+
+    def gauge(self, name: str, fn):
+        """Registers a callable returning [(labels_dict, value), ...], evaluated on read."""
+        self._gauges[name] = fn
+
+    def snapshot(self) -> dict:
+        """Plain-dict view: {metric: {labels_str: value | {count, sum, avg}}}."""
+        out = defaultdict(dict)
+        for (name, key), value in self.counters.items():
+            out[name][_format_labels(key)] = value
+        for (name, key), value in self.peaks.items():
+            out[name][_format_labels(key)] = value
+        for (name, key), hist in self.histograms.items():
+            count = sum(hist[:-1])
+            out[name][_format_labels(key)] = {
+                "count": count, "sum": round(hist[-1], 6),
+                "avg": round(hist[-1] / count, 6) if count else 0.0
+            }
+        for name, key, value in self._gauge_samples():
+            out[name][_format_labels(key)] = value
+        return dict(out)
+
+    def state(self) -> dict:
+        """Picklable copy of every series; gauges are evaluated now and kept as fixed values."""
+        gauges = {(name, key): value for name, key, value in self._gauge_samples()}
+        return {
+            "counters": dict(self.counters),
+            "histograms": {key: list(hist) for key, hist in self.histograms.items()},
+            "peaks": dict(self.peaks),
+            "gauges": gauges,
+        }
+
+    def merge(self, state: dict):
+        """Adds another process's `state()`: counters, histograms and gauge values are summed, peaks take the max."""
+        for key, value in state["counters"].items():
+            self.counters[key] += value
+        for key, hist in state["histograms"].items():
+            current = self.histograms.get(key)
+            self.histograms[key] = list(hist) if current is None else [a + b for a, b in zip(current, hist)]
+        for key, value in state["peaks"].items():
+            if value > self.peaks[key]:
+                self.peaks[key] = value
+        for key, value in state["gauges"].items():
+            self.merged_gauges[key] = self.merged_gauges.get(key, 0) + value
+
+    def _gauge_samples(self):
+        for name, fn in self._gauges.items():
+            for labels, value in fn():
+                yield name, _labels_key(labels), value
+        for (name, key), value in self.merged_gauges.items():
+            yield name, key, value
+
+    def to_prometheus(self) -> str:
+        lines = []
+        by_name = defaultdict(list)
+        for (name, key), value in self.counters.items():
+            by_name[(name, "counter")].append((key, value))
+        for (name, key), value in self.peaks.items():
+            by_name[(name, "gauge")].append((key, value))
+        for name, key, value in self._gauge_samples():
+            by_name[(name, "gauge")].append((key, value))
+        for (name, kind), samples in sorted(by_name.items()):
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in samples:
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        hist_by_name = defaultdict(list)
+        for (name, key), hist in self.histograms.items():
+            hist_by_name[name].append((key, hist))
+        for name, samples in sorted(hist_by_name.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in samples:
+                cumulative = 0
+                for bound, count in zip(self.BUCKETS, hist):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', str(bound)),))} {cumulative}")
+                cumulative += hist[len(self.BUCKETS)]
+                lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(hist[-1])}")
+                lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+class MetricsExporter:
+    """Writes Prometheus text to `path` every `interval` seconds and/or serves it on `port`."""
+    def __init__(self, metrics: Metrics, path: str = None, interval: float = 10.0,
+                 host: str = "127.0.0.1", port: int = None):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self._task = None
+        self._server = None
+
+    def _write(self, text: str):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+    async def export(self):
+        if self.path:
+            await asyncio.to_thread(self._write, self.metrics.to_prometheus())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.export()
+
+    async def _handle(self, reader, writer):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        body = self.metrics.to_prometheus().encode("utf-8")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        writer.close()
+
+    async def start(self):
+        if self.path:
+            self._task = asyncio.create_task(self._run())
+        if self.port is not None:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def close(self):
+        """Stops periodic export and writes a final snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.export()
@@ -0,0 +1,51 @@
+"""
+Micro-batching for concurrent async callers.
+`submit(item)` parks the caller until its item has been handled as part of
+a batch. A batch is dispatched as soon as `max_size` items are pending or
+`max_wait` seconds after its first item arrived, whichever comes first.
+The handler receives the items in arrival order and returns one result per
+item; an Exception instance in the result list fails only that caller.
+"""
+import asyncio
+
+class MicroBatcher:
+    def __init__(self, handler, max_size: int = 8, max_wait: float = 0.05):
+        self.handler = handler
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending = []  # [(item, future)]
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done(): # caller was cancelled
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
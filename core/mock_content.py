@@ -0,0 +1,41 @@
+"""
+Deterministic mock content for a product: the offline fallback used by
+QuestionAgent and the canned answer of the fake LLM provider.
+"""
+
+def mock_faq_and_competitor(name: str, ingredients: str) -> dict:
+    return {
+        "product_b": {
+            "name": f"EliteGlow Serum B",
+            "ingredients": "Glycerin, Vitamin E, Synthetic Actives",
+            "benefits": "Deep hydration and basic barrier protection",
+            "price": "₹899"
+        },
+        "faq": {
+            "Informational": [
+                {"q": f"How does {name} support skin barrier health?", "a": "It uses balanced actives to protect the lipid layer."},
+                {"q": f"Is {name} suitable for sensitive skin?", "a": "Yes, it is dermatologically tested for all skin types."},
+                {"q": f"What is the source of the {ingredients} in {name}?", "a": "Our ingredients are ethically sourced and medical-grade."}
+            ],
+            "Usage": [
+                {"q": f"Can I use {name} with Retinol?", "a": "Yes, but we recommend alternating nights to avoid sensitivity."},
+                {"q": f"How many drops of {name} should I apply?", "a": "2-3 drops are sufficient for the entire face."},
+                {"q": f"Can I apply makeup over {name}?", "a": "Yes, wait 60 seconds for full absorption first."}
+            ],
+            "Safety": [
+                {"q": f"Is {name} safe for pregnancy?", "a": "Consult your doctor; ingredients are generally safe but medical advice is best."},
+                {"q": f"Will {name} cause purging?", "a": "Minor purging can occur as cell turnover increases, usually lasting 1 week."},
+                {"q": f"Is {name} non-comedogenic?", "a": "Yes, it is formulated to not clog pores."}
+            ],
+            "Purchase": [
+                {"q": "Is the packaging recyclable?", "a": "Yes, we use 100% recyclable glass and minimal plastic."},
+                {"q": f"Where is {name} manufactured?", "a": "It is produced in our ISO-certified cleanroom facility."},
+                {"q": "Do you offer a subscription discount?", "a": "Yes, subscribers save 15% on every order."}
+            ],
+            "Comparison": [
+                {"q": f"How is {name} better than Competitor B?", "a": "It features a higher concentration of stabilized actives."},
+                {"q": f"Does {name} replace my moisturizer?", "a": "It is a treatment serum; we recommend following with moisturizer."},
+                {"q": f"Is {name} more effective than drug-store alternatives?", "a": "Yes, due to its medical-grade purity and delivery system."}
+            ]
+        }
+    }
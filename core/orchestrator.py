@@ -1,59 +1,168 @@
 """
 Async Orchestrator = message router with Observability.
-Processes agents concurrently.
+Processes agents concurrently: every registered agent gets its own
+worker task(s) draining its bounded inbox. Observers are called inline
+for every routed message instead of being scheduled as agents.
+
+Completion is detected deterministically: every delivered message is counted
+as in flight until the worker handling it has routed all of its outgoing
+messages, so the run is idle exactly when that counter returns to zero.
+The same accounting is kept per correlation ID (see `submit`), which lets
+batch runs track many products through the graph at once.
+
+Per-agent think/act durations, queue wait, inbox depth, message and error
+counts are recorded in `self.metrics` (core.metrics.Metrics).
 """
 import asyncio
+import time
 from core.message import Message
+from core.metrics import Metrics
 
 class Orchestrator:
     def __init__(self):
         self.agents = {}
-        self.queue = asyncio.Queue()
+        self.workers = []
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._traces = {}
+        self.observers = []
+        self.metrics = Metrics()
+        self.metrics.gauge("agent_inbox_depth", lambda: [
+            ({"agent": name}, agent.inbox.qsize()) for name, agent in self.agents.items()
+        ])
+        self.metrics.gauge("orchestrator_in_flight", lambda: [({}, self.in_flight)])
 
-    def register(self, agent):
+    def register(self, agent, concurrency: int = None):
+        if concurrency is not None:
+            agent.concurrency = concurrency
         self.agents[agent.name] = agent
+        agent.bind_metrics(self.metrics)
+
+    def add_observer(self, observer):
+        """Registers an object whose `observe(message)` is called for every routed message."""
+        self.observers.append(observer)
+
+    async def _deliver(self, agent, message: Message):
+        self.in_flight += 1
+        self._idle.clear()
+        trace = self._traces.get(message.metadata.get("correlation_id"))
+        if trace is not None:
+            trace["pending"] += 1
+        message.enqueued_at = time.perf_counter()
+        await agent.receive(message)
+        self.metrics.inc("agent_messages_received_total", agent=agent.name)
+        self.metrics.peak("agent_inbox_depth_peak", agent.inbox.qsize(), agent=agent.name)
+
+    def _settle(self, message: Message):
+        trace = self._traces.get(message.metadata.get("correlation_id"))
+        if trace is not None:
+            trace["pending"] -= 1
+            if trace["pending"] == 0:
+                self._finish_trace(message.metadata["correlation_id"])
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    def _finish_trace(self, correlation_id):
+        trace = self._traces.pop(correlation_id)
+        trace["elapsed"] = time.perf_counter() - trace.pop("started")
+        trace.pop("future").set_result(trace)
 
     async def route(self, message: Message):
-        # Every message is also sent to the AuditAgent if it exists
-        if "AuditAgent" in self.agents and message.receiver != "AuditAgent":
-            audit_msg = Message(
-                sender=message.sender,
-                receiver="AuditAgent",
-                payload=message.payload,
-                metadata={"original_receiver": message.receiver}
-            )
-            await self.agents["AuditAgent"].receive(audit_msg)
-            await self.queue.put("AuditAgent")
+        # Observers (e.g. AuditAgent) see every message inline, without a scheduling step
+        for observer in self.observers:
+            try:
+                observer.observe(message)
+            except Exception as e:
+                print(f"ERROR: observer {type(observer).__name__} failed: {e!r}")
 
+        self.metrics.inc("messages_routed_total", sender=message.sender, receiver=message.receiver)
         receiver = self.agents.get(message.receiver)
         if receiver:
-            await receiver.receive(message)
-            await self.queue.put(message.receiver)
-
-    async def start(self, initial_message: Message):
-        await self.route(initial_message)
+            trace = self._traces.get(message.metadata.get("correlation_id"))
+            if trace is not None:
+                trace["hops"].append((message.sender, message.receiver))
+            await self._deliver(receiver, message)
 
+    async def _worker(self, agent):
         while True:
-            # Check if all agents are idle and queue is empty
-            if self.queue.empty():
-                # Allow a small grace period for async tasks to register
-                await asyncio.sleep(0.5)
-                if self.queue.empty():
-                    break
-
-            agent_name = await self.queue.get()
-            agent = self.agents[agent_name]
-            
-            if agent.inbox:
-                msg = agent.inbox.pop(0)
-                # Agents think and act concurrently
+            msg = await agent.inbox.get()
+            metrics = self.metrics
+            started = time.perf_counter()
+            if msg.enqueued_at is not None:
+                metrics.observe("agent_queue_wait_seconds", started - msg.enqueued_at, agent=agent.name)
+            try:
                 result = await agent.think(msg)
+                thought = time.perf_counter()
+                metrics.observe("agent_think_seconds", thought - started, agent=agent.name)
                 outgoing = await agent.act(result)
+                metrics.observe("agent_act_seconds", time.perf_counter() - thought, agent=agent.name)
                 if outgoing:
-                    if isinstance(outgoing, list):
-                        for m in outgoing:
-                            await self.route(m)
-                    else:
-                        await self.route(outgoing)
-            
-            self.queue.task_done()
+                    if not isinstance(outgoing, list):
+                        outgoing = [outgoing]
+                    for m in outgoing:
+                        # Carry correlation metadata along the pipeline
+                        m.metadata = {**msg.metadata, **m.metadata}
+                        await self.route(m)
+            except Exception as e:
+                print(f"ERROR: {agent.name} failed on message from {msg.sender}: {e!r}")
+                metrics.inc("agent_errors_total", agent=agent.name)
+                trace = self._traces.get(msg.metadata.get("correlation_id"))
+                if trace is not None:
+                    trace["errors"].append(f"{agent.name}: {e!r}")
+            finally:
+                agent.inbox.task_done()
+                self._settle(msg)
+
+    def start_workers(self):
+        """Spawns one worker task per unit of agent concurrency (idempotent)."""
+        if self.workers:
+            return
+        for agent in self.agents.values():
+            for _ in range(max(1, agent.concurrency)):
+                self.workers.append(asyncio.create_task(self._worker(agent)))
+
+    async def submit(self, message: Message) -> dict:
+        """
+        Routes a message tagged with `metadata["correlation_id"]` and waits
+        until every message descending from it has been handled.
+        Returns the trace: {"hops": [(sender, receiver), ...], "errors": [...], "elapsed": s}.
+        """
+        correlation_id = message.metadata["correlation_id"]
+        future = asyncio.get_running_loop().create_future()
+        # pending starts at 1 so the trace cannot settle while still routing
+        trace = self._traces[correlation_id] = {
+            "pending": 1, "hops": [], "errors": [],
+            "started": time.perf_counter(), "future": future
+        }
+        self.start_workers()
+        await self.route(message)
+        trace["pending"] -= 1
+        if trace["pending"] == 0:
+            self._finish_trace(correlation_id)
+        return await future
+
+    async def run_until_idle(self):
+        """Returns as soon as no message is queued or being handled."""
+        await self._idle.wait()
+
+    async def drain(self):
+        """Waits for quiescence, stops the worker tasks and closes every agent."""
+        try:
+            await self.run_until_idle()
+        finally:
+            for task in self.workers:
+                task.cancel()
+            await asyncio.gather(*self.workers, return_exceptions=True)
+            self.workers = []
+            for agent in self.agents.values():
+                await agent.close()
+            for observer in self.observers:
+                if hasattr(observer, "close"):
+                    await observer.close()
+
+    async def start(self, initial_message: Message):
+        self.start_workers()
+        await self.route(initial_message)
+        await self.drain()
@@ -0,0 +1,190 @@
+"""
+Output sinks for rendered pages (used by OutputAgent).
+
+- FileSink (default): output/<product-slug>-<name hash>/<page>.json,
+  pretty-printed, atomic writes, unchanged pages skipped.
+- NDJSONSink: one compact JSON line per product appended to size-capped
+  shards (pages-00000.ndjson, ...), plus a sidecar index.ndjson mapping each
+  product key (RunJournal.key of the catalog row) to (shard, offset, length)
+  for random access without scanning.
+  In sharded runs each worker process writes its own pages-sNN-*.ndjson
+  shards and index-sNN.ndjson, merged into index.ndjson by the coordinator.
+
+`write(product, pages, key)` may return before the pages are on disk
+(NDJSONSink buffers). Callbacks registered with `add_listener` are called
+with the keys of the records once they are written, which is when a batch
+run may mark those products done.
+"""
+import glob
+import asyncio
+import hashlib
+import json
+import os
+import re
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-") or "product"
+
+class _ListenerMixin:
+    def add_listener(self, callback):
+        """`callback(keys)` runs on the event loop after the records with those keys were written."""
+        self._listeners.append(callback)
+
+    def _notify(self, keys: list):
+        keys = [key for key in keys if key is not None]
+        if keys:
+            for callback in self._listeners:
+                callback(keys)
+
+class FileSink(_ListenerMixin):
+    def __init__(self, root: str = "output"):
+        self.root = root
+        self._listeners = []
+        # path -> sha256 of what is on disk, saves re-reading files we wrote
+        self._hashes = {}
+
+    def _write(self, path: str, data: bytes) -> bool:
+        digest = hashlib.sha256(data).hexdigest()
+        known = self._hashes.get(path)
+        if known is None and os.path.exists(path):
+            with open(path, "rb") as f:
+                known = hashlib.sha256(f.read()).hexdigest()
+        if known == digest:
+            self._hashes[path] = digest
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._hashes[path] = digest
+        return True
+
+    def _directory(self, product: str) -> str:
+        """Slug plus a short hash of the exact name, so names that slug alike never share a directory in any run or worker."""
+        digest = hashlib.sha256(str(product).encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.root, f"{slugify(product)}-{digest}")
+
+    async def write(self, product: str, pages: dict, key: str = None):
+        directory = self._directory(product)
+        paths, payloads = [], []
+        for page_name, content in pages.items():
+            paths.append(os.path.join(directory, f"{page_name}.json"))
+            payloads.append(json.dumps(content, indent=4, ensure_ascii=False).encode("utf-8"))
+
+        written = await asyncio.gather(*(
+            asyncio.to_thread(self._write, path, data) for path, data in zip(paths, payloads)
+        ))
+        for path, changed in zip(paths, written):
+            print(f"Saved: {path}" if changed else f"Unchanged: {path}")
+        self._notify([key])
+
+    async def close(self):
+        pass
+
+class NDJSONSink(_ListenerMixin):
+    INDEX_NAME = "index.ndjson"
+
+    def __init__(self, root: str = "output", shard_bytes: int = 64 * 1024 * 1024, flush_records: int = 256,
+                 worker: int = None):
+        self.root = root
+        # Separate file names per worker process so concurrent writers never share a file
+        self.prefix = "pages" if worker is None else f"pages-s{worker:02d}"
+        self.index_name = self.INDEX_NAME if worker is None else f"index-s{worker:02d}.ndjson"
+        self.shard_bytes = shard_bytes
+        self.flush_records = flush_records
+        self._buffer = []  # [(product, line, key)]
+        self._listeners = []
+        self._lock = asyncio.Lock()
+        self._shard = None
+        self._shard_size = 0
+
+    def _next_shard(self):
+        os.makedirs(self.root, exist_ok=True)
+        existing = [n for n in os.listdir(self.root) if re.fullmatch(rf"{self.prefix}-\d{{5}}\.ndjson", n)]
+        self._shard = f"{self.prefix}-{len(existing):05d}.ndjson"
+        self._shard_size = 0
+
+    def _append(self, records):
+        if self._shard is None:
+            self._next_shard()
+        shard_f = open(os.path.join(self.root, self._shard), "ab")
+        index_lines = []
+        try:
+            for product, line, key in records:
+                if self.shard_bytes and self._shard_size and self._shard_size + len(line) > self.shard_bytes:
+                    shard_f.close()
+                    self._next_shard()
+                    shard_f = open(os.path.join(self.root, self._shard), "ab")
+                offset = shard_f.tell()
+                shard_f.write(line)
+                self._shard_size = offset + len(line)
+                index_lines.append(json.dumps({
+                    "product": product, "key": key, "shard": self._shard, "offset": offset, "length": len(line)
+                }, ensure_ascii=False) + "\n")
+        finally:
+            shard_f.close()
+        with open(os.path.join(self.root, self.index_name), "a", encoding="utf-8") as f:
+            f.write("".join(index_lines))
+
+    async def write(self, product: str, pages: dict, key: str = None):
+        line = json.dumps({"product": product, "pages": pages}, ensure_ascii=False, separators=(",", ":"))
+        self._buffer.append((product, (line + "\n").encode("utf-8"), key))
+        if len(self._buffer) >= self.flush_records:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not self._buffer:
+                return
+            records, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._append, records)
+            self._notify([key for _, _, key in records])
+
+    async def close(self):
+        await self.flush()
+
+    @classmethod
+    def merge_indexes(cls, root: str = "output"):
+        """Appends every per-worker index-sNN.ndjson to index.ndjson and removes it."""
+        paths = sorted(glob.glob(os.path.join(root, "index-s*.ndjson")))
+        if not paths:
+            return
+        with open(os.path.join(root, cls.INDEX_NAME), "a", encoding="utf-8") as out:
+            for path in paths:
+                with open(path, "r", encoding="utf-8") as f:
+                    out.write(f.read())
+                os.remove(path)
+
+    @classmethod
+    def load_index(cls, root: str = "output", by: str = "key") -> dict:
+        """
+        by="key":     product key -> (shard, offset, length)
+        by="product": product name -> [(shard, offset, length), ...], one per product with that name
+        A product written again (rerun, resume) keeps only its latest entry.
+        Entries without a key (single-product runs) are keyed by product name.
+        """
+        latest = {}
+        with open(os.path.join(root, cls.INDEX_NAME), "r", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                latest[entry.get("key") or entry["product"]] = (
+                    entry["product"], (entry["shard"], entry["offset"], entry["length"])
+                )
+        if by == "key":
+            return {key: location for key, (_, location) in latest.items()}
+        index = {}
+        for product, location in latest.values():
+            index.setdefault(product, []).append(location)
+        return index
+
+    @staticmethod
+    def read(root: str, location: tuple) -> dict:
+        """Random access to one product's pages using an index entry."""
+        shard, offset, length = location
+        with open(os.path.join(root, shard), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+SINKS = {"files": FileSink, "ndjson": NDJSONSink}
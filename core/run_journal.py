@@ -0,0 +1,147 @@
+"""
+Persistent run journal for batch catalogs (SQLite).
+Registered as an Orchestrator observer: every routed message carrying a
+ProductData / QuestionOutput payload is checkpointed under its product key
+(a hash of the raw input record) together with the agent it was sent to.
+`run_catalog` marks products done once OutputAgent has handled them.
+
+With `--resume`, finished products are skipped and in-progress ones are
+re-sent to the agent of their last checkpoint, so e.g. an approved
+QuestionOutput goes straight to TemplateAgent without another LLM call.
+
+Writes are buffered per product (the latest row wins) and committed in one
+transaction by a background task when `batch_size` rows are pending or
+`flush_interval` seconds have passed, in a worker thread. A crash loses at
+most the last interval: those products are resumed from an earlier
+checkpoint, never skipped.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from core.schema import ProductData, QuestionOutput
+
+DONE = "done"
+PAYLOAD_TYPES = {cls.__name__: cls for cls in (ProductData, QuestionOutput)}
+
+class RunJournal:
+    def __init__(self, path: str = os.path.join("logs", "run_journal.sqlite3"),
+                 batch_size: int = 64, flush_interval: float = 0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = {"checkpoints": 0, "finished": 0}
+        self._conn = None
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> row
+        self._wake = None
+        self._task = None
+        self._closing = False
+
+    @staticmethod
+    def key(raw) -> str:
+        """Stable across runs; an edited product gets a new key and is processed again."""
+        return hashlib.sha256(json.dumps(raw, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def _db(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                " key TEXT PRIMARY KEY, product TEXT, stage TEXT NOT NULL,"
+                " payload_type TEXT, payload TEXT, status TEXT, updated REAL NOT NULL)"
+            )
+        return self._conn
+
+    def reset(self):
+        """Forgets previous runs (a fresh, non-resumed batch)."""
+        with self._lock:
+            self._pending = {}
+            db = self._db()
+            db.execute("DELETE FROM products")
+            db.commit()
+
+    def observe(self, message):
+        key = message.metadata.get("product_key")
+        payload_type = type(message.payload).__name__
+        if key is None or payload_type not in PAYLOAD_TYPES:
+            return
+        self._queue(key, (key, message.metadata.get("product"), message.receiver, payload_type,
+                          message.payload.model_dump_json(), None, time.time()))
+        self.stats["checkpoints"] += 1
+
+    def finish(self, key: str, product: Optional[str], status: str):
+        self._queue(key, (key, product, DONE, None, None, status, time.time()))
+        self.stats["finished"] += 1
+
+    def _queue(self, key: str, row: tuple):
+        self._pending[key] = row
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        rows, self._pending = list(self._pending.values()), {}
+        await asyncio.to_thread(self._write, rows)
+
+    def _write(self, rows: list):
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO products (key, product, stage, payload_type, payload, status, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            db.commit()
+
+    def checkpoint(self, key: str) -> Optional[dict]:
+        """
+        {"stage", "product", "status", "payload"} for a product, payload
+        deserialized; None if unseen. Blocking: call it with asyncio.to_thread.
+        """
+        with self._lock:
+            row = self._db().execute(
+                "SELECT stage, product, status, payload_type, payload FROM products WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        stage, product, status, payload_type, payload = row
+        if payload_type in PAYLOAD_TYPES:
+            payload = PAYLOAD_TYPES[payload_type].model_validate_json(payload)
+        return {"stage": stage, "product": product, "status": status, "payload": payload}
+
+    async def close(self):
+        """Stops the background task, commits whatever is still pending and closes the database."""
+        self._closing = True
+        if self._task is not None:
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        self._closing = False
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,7 +1,15 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ConfigDict
+from typing import List, Any, Optional
+
+# Models passed between agents are immutable: they are validated once where
+# data enters the system (raw input, generated JSON) and then shared by
+# reference. Nesting an existing instance is only an isinstance check, and
+# model_copy(update=...) derives a changed version without re-validation.
+FROZEN = ConfigDict(frozen=True)
 
 class ProductData(BaseModel):
+    model_config = FROZEN
+
     name: str
     concentration: str
     skin_type: str
@@ -12,10 +20,14 @@ class ProductData(BaseModel):
     price: str
 
 class FAQItem(BaseModel):
+    model_config = FROZEN
+
     q: str
     a: str
 
 class FAQData(BaseModel):
+    model_config = FROZEN
+
     Informational: List[FAQItem]
     Usage: List[FAQItem]
     Safety: List[FAQItem]
@@ -23,16 +35,28 @@ class FAQData(BaseModel):
     Comparison: List[FAQItem]
 
 class ProductBData(BaseModel):
+    model_config = FROZEN
+
     name: str
     ingredients: str
     benefits: str
     price: str
 
+class CritiqueItem(BaseModel):
+    model_config = FROZEN
+
+    section: str # FAQ category name or "product_b"
+    shortfall: int = 0 # Missing Q&As for FAQ sections
+    message: str
+
 class QuestionOutput(BaseModel):
+    model_config = FROZEN
+
     product: ProductData
     product_b: ProductBData
     questions: FAQData
     critique: Optional[str] = None
+    critique_items: List[CritiqueItem] = []
     iteration: int = 1
 
 class AuditLog(BaseModel):
@@ -40,4 +64,5 @@ class AuditLog(BaseModel):
     sender: str
     receiver: str
     payload_type: str
-    payload: Dict[str, Any]
+    payload: Any = None
+    correlation_id: Optional[str] = None
@@ -0,0 +1,71 @@
+"""
+Process-wide settings, loaded once at startup from the environment / .env.
+"""
+import os
+from functools import lru_cache
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+PLACEHOLDER_API_KEY = "enter_api_key_over_here"
+
+DEFAULT_MODELS = [
+    'models/gemini-flash-latest',
+    'models/gemini-1.5-flash',
+    'models/gemini-2.0-flash-exp'
+]
+
+class Settings(BaseModel):
+    gemini_api_key: Optional[str] = None
+    gemini_models: List[str] = DEFAULT_MODELS
+    llm_cache_bypass: bool = False
+    llm_workers: int = 4
+    llm_requests_per_minute: float = 60
+    llm_tokens_per_minute: float = 0 # 0 = unlimited
+    llm_timeout: float = 60.0
+    llm_max_retries: int = 3
+    llm_hedge_delay: Optional[float] = None # None = strictly sequential fallback
+    llm_breaker_threshold: int = 3
+    llm_breaker_reset: float = 60.0
+    llm_stream: bool = False # parse streamed responses incrementally, stop once thresholds are met
+    llm_batch_size: int = 1 # >1: first-pass generations share one prompt
+    llm_batch_wait_ms: float = 50
+    llm_provider: str = "gemini" # gemini | fake | http
+    llm_provider_url: str = "http://127.0.0.1:8089"
+    fake_llm_latency: float = 0.05
+    fake_llm_error_rate: float = 0.0
+    faq_reuse_categories: List[str] = [] # generic FAQ categories filled from the catalog-wide index
+    faq_reuse_min_products: int = 2 # products an entry must come from before it is reused
+
+    @property
+    def use_mock(self) -> bool:
+        """No usable API key: generate content with the local mock engine."""
+        return not self.gemini_api_key or self.gemini_api_key == PLACEHOLDER_API_KEY
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    load_dotenv()
+    models = os.getenv("GEMINI_MODELS")
+    return Settings(
+        gemini_api_key=os.getenv("GEMINI_API_KEY"),
+        gemini_models=[m.strip() for m in models.split(",") if m.strip()] if models else DEFAULT_MODELS,
+        llm_cache_bypass=os.getenv("LLM_CACHE_BYPASS", "") == "1",
+        llm_workers=int(os.getenv("LLM_WORKERS", 4)),
+        llm_requests_per_minute=float(os.getenv("LLM_RPM", 60)),
+        llm_tokens_per_minute=float(os.getenv("LLM_TPM", 0)),
+        llm_timeout=float(os.getenv("LLM_TIMEOUT", 60)),
+        llm_max_retries=int(os.getenv("LLM_MAX_RETRIES", 3)),
+        llm_hedge_delay=float(os.environ["LLM_HEDGE_DELAY"]) if os.getenv("LLM_HEDGE_DELAY") else None,
+        llm_breaker_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", 3)),
+        llm_breaker_reset=float(os.getenv("LLM_BREAKER_RESET", 60)),
+        llm_stream=os.getenv("LLM_STREAM", "") == "1",
+        llm_batch_size=int(os.getenv("LLM_BATCH_SIZE", 1)),
+        llm_batch_wait_ms=float(os.getenv("LLM_BATCH_WAIT_MS", 50)),
+        llm_provider=os.getenv("LLM_PROVIDER", "gemini"),
+        llm_provider_url=os.getenv("LLM_PROVIDER_URL", "http://127.0.0.1:8089"),
+        fake_llm_latency=float(os.getenv("FAKE_LLM_LATENCY", 0.05)),
+        fake_llm_error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", 0)),
+        faq_reuse_categories=[c.strip() for c in os.getenv("FAQ_REUSE_CATEGORIES", "").split(",") if c.strip()],
+        faq_reuse_min_products=int(os.getenv("FAQ_REUSE_MIN_PRODUCTS", 2)),
+    )
@@ -0,0 +1,125 @@
+"""
+Multi-process sharded batch runner.
+The coordinator splits a catalog across N worker processes (catalog product
+i goes to worker i % N) in one streaming pass, writing each worker's slice
+to its own temporary JSONL file, so no worker reads or decodes the products
+of the others. The same pass finds duplicate product names across the whole
+catalog, which no single worker could see. Each worker builds its own Orchestrator with
+`builder(worker=k, **builder_kwargs)` and runs `run_catalog` on its slice
+in its own event loop, so parsing, validation, rendering and serialization
+use N cores. Afterwards the coordinator merges:
+- per-product summaries, back into catalog order
+- per-worker audit trails (logs/audit_trail.wNN.jsonl), by timestamp
+- per-worker NDJSON indexes, into output/index.ndjson
+- metrics (counters/histograms summed, peaks maxed)
+"""
+import asyncio
+import glob
+import heapq
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from core.batch import iter_products, product_name, run_catalog
+from core.metrics import Metrics
+from core.output_sinks import NDJSONSink
+from core.run_journal import RunJournal
+
+def worker_audit_path(audit_path: str, worker: int) -> str:
+    root, ext = os.path.splitext(audit_path)
+    return f"{root}.w{worker:02d}{ext}"
+
+def split_catalog(path: str, directory: str, workers: int) -> tuple:
+    """
+    Writes catalog product i to `directory`/shard-(i % workers).jsonl.
+    Returns (shard paths, per-worker {catalog index: first index} of the
+    rows repeating an earlier product name).
+    """
+    paths = [os.path.join(directory, f"shard-{worker:02d}.jsonl") for worker in range(workers)]
+    duplicates = [{} for _ in range(workers)]
+    first_rows = {}
+    files = [open(p, "w", encoding="utf-8") for p in paths]
+    try:
+        for i, product in enumerate(iter_products(path)):
+            files[i % workers].write(json.dumps(product, ensure_ascii=False) + "\n")
+            name = product_name(product)
+            if name and first_rows.setdefault(name, i) != i:
+                duplicates[i % workers][i] = first_rows[name]
+    finally:
+        for f in files:
+            f.close()
+    return paths, duplicates
+
+def _worker_main(builder, builder_kwargs: dict, shard_path: str, worker: int, workers: int,
+                 in_flight: int, journal_path: str, prevalidate: int = 0, duplicates: dict = None) -> dict:
+    return asyncio.run(_run_worker(builder, builder_kwargs, shard_path, worker, workers, in_flight,
+                                   journal_path, prevalidate, duplicates))
+
+async def _run_worker(builder, builder_kwargs, shard_path, worker, workers, in_flight, journal_path, prevalidate,
+                      duplicates) -> dict:
+    orchestrator = builder(worker=worker, **builder_kwargs)
+    products = iter_products(shard_path)
+    journal = RunJournal(journal_path) if journal_path else None
+    # The coordinator resets the journal once for fresh runs, so workers always resume
+    summaries = await run_catalog(orchestrator, products, max_in_flight=in_flight,
+                                  journal=journal, resume=True, start=worker, step=workers,
+                                  prevalidate=prevalidate, duplicates=duplicates or {})
+    return {"summaries": summaries, "metrics": orchestrator.metrics.state()}
+
+def merge_audit_logs(audit_path: str, workers: int):
+    """Merges the per-worker trails (and their rotated backups) into `audit_path` by timestamp."""
+    sources = []
+    for worker in range(workers):
+        base = worker_audit_path(audit_path, worker)
+        rotated = [p for p in glob.glob(f"{base}.*") if p.rsplit(".", 1)[1].isdigit()]
+        # Highest backup number is the oldest
+        rotated.sort(key=lambda p: int(p.rsplit(".", 1)[1]), reverse=True)
+        sources.append([p for p in rotated + [base] if os.path.exists(p)])
+
+    def read(paths):
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                yield from f
+
+    if not any(sources):
+        return
+    os.makedirs(os.path.dirname(audit_path) or ".", exist_ok=True)
+    with open(audit_path, "a", encoding="utf-8") as out:
+        for line in heapq.merge(*(read(paths) for paths in sources), key=lambda l: json.loads(l)["timestamp"]):
+            out.write(line)
+    for paths in sources:
+        for path in paths:
+            os.remove(path)
+
+async def run_sharded(builder, builder_kwargs: dict, path: str, workers: int, in_flight: int = 8,
+                      journal_path: str = None, resume: bool = False,
+                      audit_path: str = os.path.join("logs", "audit_trail.jsonl"),
+                      output_root: str = "output", prevalidate: int = 0):
+    """Returns (summaries in catalog order, merged Metrics)."""
+    if journal_path and not resume:
+        journal = RunJournal(journal_path)
+        await asyncio.to_thread(journal.reset)
+        await journal.close()
+
+    loop = asyncio.get_running_loop()
+    with tempfile.TemporaryDirectory(prefix="catalog-shards-") as directory:
+        shard_paths, duplicates = await asyncio.to_thread(split_catalog, path, directory, workers)
+        # spawn: workers start from a clean interpreter instead of forking a running event loop
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, _worker_main, builder, builder_kwargs, shard_paths[worker],
+                                     worker, workers, in_flight, journal_path, prevalidate, duplicates[worker])
+                for worker in range(workers)
+            ))
+
+    summaries = [summary for result in results for summary in result["summaries"]]
+    summaries.sort(key=lambda s: int(s["correlation_id"].split("-", 1)[0]))
+    metrics = Metrics()
+    for result in results:
+        metrics.merge(result["metrics"])
+
+    await asyncio.to_thread(merge_audit_logs, audit_path, workers)
+    NDJSONSink.merge_indexes(output_root)
+    return summaries, metrics
@@ -0,0 +1,47 @@
+"""
+Startup-time profile: import-time breakdown of a module (default: main).
+Runs `python -X importtime -c "import <module>"` in a subprocess and
+aggregates the per-module self/cumulative times.
+
+    python main.py --profile-startup
+"""
+import subprocess
+import sys
+import time
+
+def profile_imports(module: str = "main", top: int = 20) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+
+    top_level = {r["module"]: r["cumulative_ms"] for r in rows if r["depth"] == 0}
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "process_wall_ms": round(wall * 1000, 1),
+        "import_ms": round(top_level.get(module, 0.0), 1),
+        "top_self": sorted(rows, key=lambda r: r["self_ms"], reverse=True)[:top],
+        "top_cumulative": sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[:top],
+    }
+
+def print_profile(report: dict):
+    print(f"--- Startup profile: import {report['module']} ---")
+    print(f"import: {report['import_ms']} ms, process incl. interpreter: {report['process_wall_ms']} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for row in report["top_cumulative"]:
+        print(f"{row['cumulative_ms']:>14.1f} {row['self_ms']:>9.1f}  {'  ' * row['depth']}{row['module']}")
@@ -0,0 +1,113 @@
+"""
+Incremental parser for streamed QuestionAgent responses.
+Scans chunks as they arrive, tracking JSON nesting without re-parsing the
+whole text. Each object at faq.<Category>[i] is validated as an FAQItem the
+moment its closing brace arrives, and product_b as ProductBData; items that
+fail validation are counted and skipped instead of discarding the whole
+generation. The validated instances are kept (not dumped back to dicts), so
+building the QuestionOutput does not validate them again. Text before the
+first "{" (e.g. a ```json fence) and after the root object closes is ignored.
+"""
+import json
+
+from core.schema import FAQItem, ProductBData
+
+class IncrementalFAQParser:
+    def __init__(self):
+        self.text = ""
+        self.faq = {}           # category -> [FAQItem] in arrival order
+        self.product_b = None
+        self.invalid_items = 0
+        self.started = False
+        self.closed = False     # root object fully received
+        self.broken = False     # mismatched brackets; nothing after this point is trusted
+        self._pos = 0
+        self._stack = []        # [kind, path, key, index, start]
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+
+    def counts(self) -> dict:
+        return {category: len(items) for category, items in self.faq.items()}
+
+    def result(self) -> dict:
+        data = {"faq": {category: list(items) for category, items in self.faq.items()}}
+        if self.product_b is not None:
+            data["product_b"] = self.product_b
+        return data
+
+    def feed(self, chunk: str) -> list:
+        """Consumes a chunk; returns the items completed by it as ("faq", category, item) / ("product_b", data)."""
+        self.text += chunk
+        events = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            if self.closed or self.broken:
+                break
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start:i + 1]
+                continue
+            if not self.started:
+                if c != "{":
+                    continue
+                self.started = True
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                path = []
+                if self._stack:
+                    parent = self._stack[-1]
+                    path = parent[1] + [parent[2] if parent[0] == "{" else parent[3]]
+                if c == "[" and len(path) == 2 and path[0] == "faq":
+                    self.faq.setdefault(path[1], [])
+                self._stack.append([c, path, None, 0, i])
+            elif c in "}]":
+                kind, path, _, _, start = self._stack.pop() if self._stack else (None, None, None, None, None)
+                if kind != ("{" if c == "}" else "["):
+                    self.broken = True
+                    break
+                if c == "}":
+                    event = self._complete(path, text[start:i + 1])
+                    if event:
+                        events.append(event)
+                if not self._stack:
+                    self.closed = True
+            elif c == ":" and self._stack and self._stack[-1][0] == "{":
+                try:
+                    self._stack[-1][2] = json.loads(self._last_string)
+                except (TypeError, ValueError):
+                    self._stack[-1][2] = None
+            elif c == "," and self._stack:
+                if self._stack[-1][0] == "[":
+                    self._stack[-1][3] += 1
+                else:
+                    self._stack[-1][2] = None
+        self._pos = len(text)
+        return events
+
+    def _complete(self, path: list, raw: str):
+        if len(path) == 3 and path[0] == "faq" and isinstance(path[1], str):
+            try:
+                item = FAQItem.model_validate_json(raw)
+            except (TypeError, ValueError):
+                self.invalid_items += 1
+                return None
+            self.faq.setdefault(path[1], []).append(item)
+            return ("faq", path[1], item)
+        if path == ["product_b"]:
+            try:
+                self.product_b = ProductBData.model_validate_json(raw)
+            except (TypeError, ValueError):
+                self.invalid_items += 1
+                return None
+            return ("product_b", self.product_b)
+        return None
@@ -0,0 +1,101 @@
+"""
+Compiled JSON template engine.
+Every `templates/*.json` file is parsed once and compiled into a tree of
+render functions plus an index of the `{placeholder}` names it declares.
+Templates are recompiled when their mtime changes (checked at most every
+`reload_interval` seconds), so rendering is a single pass over the plan.
+
+A string that is exactly one placeholder ("{informational_questions}") is
+replaced by the bound value as-is (lists/dicts allowed); placeholders inside
+longer strings ("FAQ: {product_name}") are substituted as text. Unbound
+placeholders are left untouched.
+"""
+import glob
+import json
+import os
+import re
+import time
+
+PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+def _compile(node, placeholders: set):
+    if isinstance(node, dict):
+        items = [(key, _compile(value, placeholders)) for key, value in node.items()]
+        return lambda ctx: {key: render(ctx) for key, render in items}
+    if isinstance(node, list):
+        items = [_compile(value, placeholders) for value in node]
+        return lambda ctx: [render(ctx) for render in items]
+    if isinstance(node, str):
+        names = PLACEHOLDER.findall(node)
+        if not names:
+            return lambda ctx: node
+        placeholders.update(names)
+        whole = PLACEHOLDER.fullmatch(node)
+        if whole:
+            name = whole.group(1)
+            return lambda ctx: ctx.get(name, node)
+        # Alternating literal / placeholder segments
+        parts = PLACEHOLDER.split(node)
+        def render_text(ctx):
+            out = []
+            for i, part in enumerate(parts):
+                if i % 2:
+                    out.append(str(ctx[part]) if part in ctx else "{" + part + "}")
+                else:
+                    out.append(part)
+            return "".join(out)
+        return render_text
+    return lambda ctx: node
+
+class CompiledTemplate:
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self.mtime = os.stat(path).st_mtime
+        with open(path, "r", encoding="utf-8") as f:
+            source = json.load(f)
+        self.placeholders = set()
+        self._render = _compile(source, self.placeholders)
+
+    def render(self, context: dict):
+        return self._render(context)
+
+class TemplateEngine:
+    def __init__(self, directory: str = "templates", reload_interval: float = 1.0):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self.templates = {}
+        self._checked = 0.0
+        self._reload()
+
+    def _reload(self):
+        paths = {os.path.splitext(os.path.basename(p))[0]: p
+                 for p in glob.glob(os.path.join(self.directory, "*.json"))}
+        for name in list(self.templates):
+            if name not in paths:
+                del self.templates[name]
+        for name, path in sorted(paths.items()):
+            current = self.templates.get(name)
+            if current is None or os.stat(path).st_mtime != current.mtime:
+                self.templates[name] = CompiledTemplate(name, path)
+        self._checked = time.monotonic()
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._checked >= self.reload_interval:
+            self._reload()
+
+    def names(self) -> list:
+        self._maybe_reload()
+        return list(self.templates)
+
+    def placeholders(self, name: str) -> set:
+        return self.templates[name].placeholders
+
+    def render(self, name: str, context: dict):
+        self._maybe_reload()
+        return self.templates[name].render(context)
+
+    def render_all(self, context: dict) -> dict:
+        """Renders every template; keys are template names."""
+        self._maybe_reload()
+        return {name: tpl.render(context) for name, tpl in self.templates.items()}
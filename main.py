@@ -1,12 +1,27 @@
 """
 Advanced Agentic System Entry Point (Async)
+
+Usage:
+    python main.py                                   # single product (data/product.json)
+    python main.py --batch catalog.jsonl --in-flight 16
+    python main.py --batch catalog.jsonl --resume    # continue an interrupted batch
+    python main.py --batch catalog.jsonl --workers 4 # shard across 4 processes
+    python main.py --batch catalog.jsonl --prevalidate 1024  # bulk-check rows before routing
 """
+import argparse
 import asyncio
 import json
 import os
+from collections import Counter
 
 from core.orchestrator import Orchestrator
 from core.message import Message
+from core.batch import iter_products, run_catalog, validation_report
+from core.llm_cache import ResponseCache
+from core.metrics import MetricsExporter
+from core.output_sinks import SINKS
+from core.run_journal import RunJournal
+from core.settings import get_settings
 
 from agents.input_agent import InputAgent
 from agents.data_validation_agent import DataValidationAgent
@@ -17,32 +32,132 @@ from agents.template_agent import TemplateAgent
 from agents.output_agent import OutputAgent
 from agents.audit_agent import AuditAgent
 
-async def main():
-    # Load raw product data
-    data_path = os.path.join("data", "product.json")
-    with open(data_path, "r", encoding="utf-8") as f:
-        raw_product = json.load(f)
+AUDIT_PATH = os.path.join("logs", "audit_trail.jsonl")
+VALIDATION_REPORT_PATH = os.path.join("logs", "validation_report.json")
 
+def build_orchestrator(cache_bypass: bool = False, sink: str = "files", question_concurrency: int = 4,
+                       llm_provider=None, llm_executor=None, worker: int = None, settings=None) -> Orchestrator:
+    """`worker` is set in sharded runs: the audit trail and NDJSON files get per-process names."""
     orchestrator = Orchestrator()
 
+    audit_path = None
+    sink_kwargs = {}
+    if worker is not None:
+        from core.sharded import worker_audit_path
+        audit_path = worker_audit_path(AUDIT_PATH, worker)
+        if sink == "ndjson":
+            sink_kwargs["worker"] = worker
+    orchestrator.add_observer(AuditAgent("AuditAgent", log_path=audit_path)) # Observability
+
     # Register all agents including new ones
-    orchestrator.register(AuditAgent("AuditAgent")) # Observability
     orchestrator.register(InputAgent("InputAgent"))
     orchestrator.register(DataValidationAgent("DataValidationAgent"))
     orchestrator.register(ParserAgent("ParserAgent"))
-    orchestrator.register(QuestionAgent("QuestionAgent"))
+    orchestrator.register(QuestionAgent(
+        "QuestionAgent", concurrency=question_concurrency, # I/O-bound LLM calls
+        cache=ResponseCache(bypass=cache_bypass or get_settings().llm_cache_bypass),
+        settings=settings, provider=llm_provider, executor=llm_executor
+    ))
     orchestrator.register(EditorAgent("EditorAgent")) # Quality Control Loop
     orchestrator.register(TemplateAgent("TemplateAgent"))
-    orchestrator.register(OutputAgent("OutputAgent"))
+    orchestrator.register(OutputAgent("OutputAgent", sink=SINKS[sink]("output", **sink_kwargs)))
+    return orchestrator
+
+def write_summary(summaries: list, summary_path: str, prevalidated: bool = False):
+    os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summaries, f, indent=4, ensure_ascii=False)
 
-    print("--- Starting Advanced Agentic System ---")
-    start_message = Message(
-        sender="SYSTEM",
-        receiver="InputAgent",
-        payload=raw_product
+    counts = Counter(s["status"] for s in summaries)
+    print(f"\n===== BATCH COMPLETE: {len(summaries)} products {dict(counts)} =====")
+    print(f"Summary: {summary_path}")
+    if prevalidated:
+        report = validation_report(summaries)
+        with open(VALIDATION_REPORT_PATH, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Validation report: {VALIDATION_REPORT_PATH} ({report['rejected']}/{report['checked']} rejected)")
+
+async def run_batch(orchestrator: Orchestrator, path: str, in_flight: int, summary_path: str,
+                    journal_path: str = None, resume: bool = False, prevalidate: int = 0):
+    print(f"--- {'Resuming' if resume else 'Starting'} Batch Run: {path} (in flight: {in_flight}) ---")
+    journal = RunJournal(journal_path) if journal_path else None
+    summaries = await run_catalog(orchestrator, iter_products(path), max_in_flight=in_flight,
+                                  journal=journal, resume=resume, prevalidate=prevalidate)
+    write_summary(summaries, summary_path, prevalidated=prevalidate > 0)
+
+async def run_sharded_batch(args):
+    """--workers N: one Orchestrator per process; results, audit trails and metrics merged here."""
+    from core.sharded import run_sharded
+    print(f"--- {'Resuming' if args.resume else 'Starting'} Sharded Batch Run: {args.batch} "
+          f"({args.workers} workers, in flight per worker: {args.in_flight}) ---")
+    summaries, metrics = await run_sharded(
+        build_orchestrator, {"cache_bypass": args.no_cache, "sink": args.sink},
+        args.batch, args.workers, in_flight=args.in_flight,
+        journal_path=args.journal or None, resume=args.resume, audit_path=AUDIT_PATH,
+        prevalidate=args.prevalidate
     )
+    write_summary(summaries, args.summary, prevalidated=args.prevalidate > 0)
+    if args.metrics_file:
+        await MetricsExporter(metrics, path=args.metrics_file).export()
+
+async def main():
+    parser = argparse.ArgumentParser(description="Agentic content generation system")
+    parser.add_argument("--batch", metavar="PATH", help="catalog file (JSONL or JSON array) to process")
+    parser.add_argument("--in-flight", type=int, default=8, help="products processed concurrently in batch mode")
+    parser.add_argument("--workers", type=int, default=1, help="batch mode: shard the catalog across N processes")
+    parser.add_argument("--summary", default=os.path.join("logs", "batch_summary.json"), help="per-product result summary path")
+    parser.add_argument("--journal", default=os.path.join("logs", "run_journal.sqlite3"),
+                        help="batch checkpoint journal ('' disables it)")
+    parser.add_argument("--resume", action="store_true", help="skip products the journal marks done, restart the rest from their last checkpoint")
+    parser.add_argument("--prevalidate", type=int, default=0, metavar="CHUNK",
+                        help="batch mode: validate CHUNK rows at a time before routing; rejects go to one report (0 = off)")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the LLM response cache")
+    parser.add_argument("--sink", choices=sorted(SINKS), default="files", help="output layout: per-page files or NDJSON shards")
+    parser.add_argument("--metrics-file", metavar="PATH", help="periodically write Prometheus metrics to PATH")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="seconds between metrics snapshots")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on 127.0.0.1:PORT")
+    parser.add_argument("--profile-startup", action="store_true", help="print an import-time breakdown and exit")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        from core.startup_profile import print_profile, profile_imports
+        print_profile(profile_imports("main"))
+        return
+
+    if args.batch and args.workers > 1:
+        # Live metrics (--metrics-port) are per process; sharded runs export the merged file at the end
+        await run_sharded_batch(args)
+        return
+
+    orchestrator = build_orchestrator(args.no_cache, args.sink)
+    exporter = None
+    if args.metrics_file or args.metrics_port is not None:
+        exporter = MetricsExporter(orchestrator.metrics, path=args.metrics_file,
+                                   interval=args.metrics_interval, port=args.metrics_port)
+        await exporter.start()
+
+    try:
+        if args.batch:
+            await run_batch(orchestrator, args.batch, args.in_flight, args.summary, args.journal, args.resume,
+                                args.prevalidate)
+            return
+
+        # Load raw product data
+        data_path = os.path.join("data", "product.json")
+        with open(data_path, "r", encoding="utf-8") as f:
+            raw_product = json.load(f)
+
+        print("--- Starting Advanced Agentic System ---")
+        start_message = Message(
+            sender="SYSTEM",
+            receiver="InputAgent",
+            payload=raw_product
+        )
 
-    await orchestrator.start(start_message)
+        await orchestrator.start(start_message)
+    finally:
+        if exporter:
+            await exporter.close()
 
 if __name__ == "__main__":
     asyncio.run(main())